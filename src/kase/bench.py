@@ -0,0 +1,227 @@
+"""Benchmarks of kase against synthetic case repositories
+
+Generates case directories and Salesforce CSV exports of a given size and
+description length, then measures how loading, filtering and starting the
+finder scale. Results are plain dicts so they can be stored as JSON and
+compared across versions.
+"""
+
+import asyncio
+import csv
+import gc
+import importlib.metadata
+import json
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .cases import CaseRepo
+from .importer import SalesforceCSV
+from .profiling import percentiles
+from .search import CaseSearch
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_QUERY = "kernel panic"
+
+WORDS = [
+    "kernel",
+    "panic",
+    "network",
+    "timeout",
+    "storage",
+    "latency",
+    "upgrade",
+    "failure",
+    "memory",
+    "leak",
+    "driver",
+    "firmware",
+    "cluster",
+    "node",
+    "disk",
+    "controller",
+    "packet",
+    "loss",
+    "boot",
+    "hang",
+    "certificate",
+    "expired",
+    "login",
+    "error",
+    "database",
+    "replication",
+    "backup",
+    "restore",
+    "migration",
+    "performance",
+    "regression",
+    "crash",
+    "dump",
+    "container",
+    "image",
+    "registry",
+]
+
+
+def generate_repo(
+    case_dir: Path, count: int, desc_length: int, seed: int = 0, start: int = 1
+) -> None:
+    """Write count synthetic case directories under case_dir"""
+    for sf, title, desc in _synthetic_cases(count, desc_length, seed, start):
+        folder = case_dir / sf
+        folder.mkdir(parents=True, exist_ok=True)
+        with (folder / "case.json").open("w") as f:
+            json.dump({"title": title, "desc": desc, "sf": sf, "lp": ""}, f)
+
+
+def generate_csv(
+    csv_file: Path, count: int, desc_length: int, seed: int = 0, start: int = 1
+) -> None:
+    """Write a Salesforce export of count synthetic cases to csv_file"""
+    with csv_file.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SalesforceCSV.REQUIRED_COLUMNS)
+        writer.writerows(_synthetic_cases(count, desc_length, seed, start))
+
+
+def _synthetic_cases(
+    count: int, desc_length: int, seed: int, start: int
+) -> Iterator[tuple[str, str, str]]:
+    rng = random.Random(seed)
+    for i in range(count):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize()
+        words: list[str] = []
+        length = 0
+        while length < desc_length:
+            words.append(rng.choice(WORDS))
+            length += len(words[-1]) + 1
+        yield f"{start + i:08d}", title, " ".join(words)[:desc_length]
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    """Seconds taken by fn()"""
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+@contextmanager
+def peak_memory() -> Iterator[dict[str, float]]:
+    """Record the peak traced allocation of the block, in MB, under "peak_mb" """
+    result: dict[str, float] = {}
+    gc.collect()
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mb"] = peak / 2**20
+
+
+def keystroke_latencies(repo: CaseRepo, query: str, rounds: int = 3) -> list[float]:
+    """Seconds per filter pass while typing query and deleting it again
+
+    Each round starts from a fresh CaseSearch over freshly listed cases, the
+    way the finder does on startup, so the first keystroke pays for loading
+    the search text.
+    """
+    steps = [query[:n] for n in range(1, len(query) + 1)]
+    steps += steps[-2::-1]
+    samples: list[float] = []
+    for _ in range(rounds):
+        search = CaseSearch(repo.cases)
+        for step in steps:
+            started = time.perf_counter()
+            search.filter(step)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def time_to_first_paint(case_dir: str) -> float:
+    """Seconds from creating the finder until it is ready under a headless pilot"""
+    from .tui.query import QueryApp
+
+    async def run() -> float:
+        started = time.perf_counter()
+        app = QueryApp(case_dir)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            return time.perf_counter() - started
+
+    return asyncio.run(run())
+
+
+def bench_size(
+    count: int, desc_length: int, query: str = DEFAULT_QUERY, rounds: int = 3
+) -> dict[str, Any]:
+    """Benchmark a repository and a CSV export of count cases"""
+    with tempfile.TemporaryDirectory(prefix="kase-bench-") as tmp:
+        case_dir = Path(tmp) / "cases"
+        csv_file = Path(tmp) / "cases.csv"
+        generate_repo(case_dir, count, desc_length)
+        generate_csv(csv_file, count, desc_length)
+
+        def load_repo() -> None:
+            for _ in CaseRepo(str(case_dir)).cases:
+                pass
+
+        def load_csv() -> None:
+            # Held like the importer's selector does, to measure what it keeps
+            list(SalesforceCSV(csv_file, case_dir).summaries())
+
+        # The first load has to parse every case.json and writes the index
+        cold = timed(load_repo)
+        warm = timed(load_repo)
+        with peak_memory() as repo_memory:
+            load_repo()
+        csv_load = timed(load_csv)
+        with peak_memory() as csv_memory:
+            load_csv()
+        latencies = keystroke_latencies(CaseRepo(str(case_dir)), query, rounds)
+        first_paint = time_to_first_paint(str(case_dir))
+
+    return {
+        "cases": count,
+        "repo_load_cold_s": cold,
+        "repo_load_warm_s": warm,
+        "repo_load_peak_mb": repo_memory["peak_mb"],
+        "csv_load_s": csv_load,
+        "csv_load_peak_mb": csv_memory["peak_mb"],
+        "filter_latency_s": percentiles(latencies),
+        "first_paint_s": first_paint,
+    }
+
+
+def run(
+    sizes: tuple[int, ...] | list[int] = DEFAULT_SIZES,
+    desc_length: int = 1000,
+    query: str = DEFAULT_QUERY,
+    rounds: int = 3,
+    progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Benchmark every size in turn, calling progress with each result"""
+    try:
+        version = importlib.metadata.version("kase")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    results = []
+    for count in sizes:
+        result = bench_size(count, desc_length, query, rounds)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {
+        "kase": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "desc_length": desc_length,
+        "query": query,
+        "results": results,
+    }
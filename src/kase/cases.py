@@ -1,41 +1,69 @@
+import functools
 import json
 import os
 import re
 import textwrap
-from collections.abc import Iterable
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from enum import Enum
 from glob import glob
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, Protocol, TypeVar
 
-from pydantic import BaseModel
+from . import profiling
+from .index import CaseIndex, IndexEntry
+from .search import SearchKeys
 
+# Case is a pydantic model, which is slow to import and only needed to parse
+# and write case.json files; listing cases from the index does without it
+if TYPE_CHECKING:
+    from .model import Case
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Fields every listed case has loaded; the description is read on demand
+SUMMARY_FIELDS = ("title", "sf", "lp")
+
+
+class ListedCase(Protocol):
+    """The fields every listed case has, whether it is a Case or a CaseSummary"""
 
-class Case(BaseModel):
     path: Path
     title: str
-    desc: str
     sf: str
-    lp: str = ""
+    lp: str
 
-    def write_metadata(self, clobber: bool = False) -> bool:
-        # Check if case.json already exists - don't overwrite
-        metadata = self.model_dump()
-        path = metadata.pop("path")
+    @property
+    def desc(self) -> str: ...
 
-        metadata_file = path / "case.json"
-        if metadata_file.exists() and not clobber:
-            return False
-        # Create directory if it doesn't exist
-        if not path.exists():
-            path.mkdir(parents=True, exist_ok=True)
-        with metadata_file.open("w") as f:
-            json.dump(metadata, f, indent=4)
-        return True
-
-    @classmethod
-    def from_folder(cls, folder: Path) -> "Case":
-        with (folder / "case.json").open("r") as f:
-            data = json.load(f)
-            return cls(path=folder, **data)
+    @property
+    def search_keys(self) -> SearchKeys: ...
+
+    @property
+    def mtime_ns(self) -> int | None: ...
+
+    @property
+    def preview(self) -> str: ...
+
+
+class _CaseFolder:
+    """What Case and CaseSummary read from the case folder in the same way"""
+
+    if TYPE_CHECKING:
+        # Kept out of the runtime annotations, which pydantic would make fields
+        path: Path
+        title: str
+        sf: str
+        desc: str
+
+    @functools.cached_property
+    def mtime_ns(self) -> int | None:
+        """Modification time of the case's case.json, None if it has none"""
+        try:
+            return (self.path / "case.json").stat().st_mtime_ns
+        except OSError:
+            return None
 
     @property
     def preview(self) -> str:
@@ -48,31 +76,361 @@ class Case(BaseModel):
         ).format(sf=self.sf, title=self.title, desc=self.desc)
 
 
+class CaseSummary(_CaseFolder):
+    """A case listed by a CaseRepo, without its description loaded
+
+    The description is read from the case's case.json the first time it is
+    asked for, raising the error of the read if the case was changed or
+    removed since it was listed. load() gives the full Case, which is what
+    should be written out or serialized.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        title: str,
+        sf: str,
+        lp: str,
+        details: "CaseDetails",
+        mtime_ns: int | None = None,
+    ):
+        self.path = path
+        self.title = title
+        self.sf = sf
+        self.lp = lp
+        self._details = details
+        self._desc: str | None = None
+        if mtime_ns is not None:
+            self.__dict__["mtime_ns"] = mtime_ns
+
+    def __repr__(self) -> str:
+        return f"CaseSummary(path={self.path!r}, sf={self.sf!r}, title={self.title!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CaseSummary):
+            return NotImplemented
+        return (self.path, self.title, self.sf, self.lp) == (
+            other.path,
+            other.title,
+            other.sf,
+            other.lp,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def load(self) -> "Case":
+        """Read the full case from its case.json"""
+        return CaseRepo._load_meta(self.path / "case.json")
+
+    @property
+    def desc(self) -> str:
+        if self._desc is None:
+            self._desc = self.load().desc
+        return self._desc
+
+    @functools.cached_property
+    def search_keys(self) -> SearchKeys:
+        return self._details.search_keys(self)
+
+
+class CaseLoadError(NamedTuple):
+    path: Path
+    error: Exception
+
+
+class ChangeKind(str, Enum):
+    added = "added"
+    changed = "changed"
+    removed = "removed"
+
+
+class CaseChange(NamedTuple):
+    kind: ChangeKind
+    # The case folder
+    path: Path
+    # The case as it is now, None if it was removed
+    case: "Case | None"
+
+
+class CaseDetails:
+    """Loads the search keys of listed cases
+
+    Search keys include the description, which summaries leave out, but are
+    wanted for every case as soon as a filter is typed. So they are read for
+    all cases at once from the search index, falling back to the case.json of
+    cases that are missing from it or changed since it was written.
+    """
+
+    def __init__(self, index: CaseIndex | None):
+        self.index = index
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def search_keys(self, case: CaseSummary) -> SearchKeys:
+        if self.index is not None:
+            with self._lock:
+                if not self._loaded:
+                    self.index.load()
+                    self._loaded = True
+            entry = self.index.entries.get(case.path.name)
+            if entry is not None and entry["mtime_ns"] == case.mtime_ns:
+                return SearchKeys(**entry["data"])
+        try:
+            desc = case.desc
+        except (OSError, ValueError, TypeError):
+            # The case was changed or removed since it was listed, which the
+            # watcher will catch up with; until then it is matched without
+            # its description
+            desc = ""
+        return SearchKeys.build(case.sf, case.lp, case.title, desc)
+
+    def is_outdated(self, summaries: CaseIndex) -> bool:
+        """Whether the search index may lack cases listed in summaries
+
+        The search index is always written after the summary index, so one
+        that is missing or older was deleted or failed to save, and the
+        summary index alone no longer tells which cases it is missing.
+        """
+        if self.index is None:
+            return False
+        try:
+            written = self.index.path.stat().st_mtime_ns
+        except OSError:
+            return True
+        try:
+            return written < summaries.path.stat().st_mtime_ns
+        except OSError:
+            return False
+
+    def update(
+        self, summaries: dict[str, IndexEntry], entries: dict[str, IndexEntry]
+    ) -> None:
+        """Save the search keys of changed cases, dropping those not in summaries
+
+        Cases that have no search keys for the version in summaries are read
+        again, so that a lost or partly written search index is repaired.
+        """
+        if self.index is None:
+            return
+        with self._lock:
+            if not self._loaded:
+                self.index.load()
+            kept = {
+                name: entry
+                for name, entry in self.index.entries.items()
+                if name in summaries and name not in entries
+            }
+            merged = kept | entries
+            for name, summary in summaries.items():
+                entry = merged.get(name)
+                if entry is not None and entry["mtime_ns"] == summary["mtime_ns"]:
+                    continue
+                meta = self.index.path.parent / name / "case.json"
+                try:
+                    stat = meta.stat()
+                    keys = CaseRepo._load_meta(meta).search_keys
+                except (OSError, ValueError, TypeError):
+                    # Left for search_keys to fall back on, like any case
+                    # changed since it was listed
+                    merged.pop(name, None)
+                    continue
+                merged[name] = self.index.make_entry(stat, keys._asdict())
+            self.index.entries = merged
+            self.index.save()
+            # Let the keys go until a filter needs them
+            self.index.entries = {}
+            self._loaded = False
+
+
+# A loaded case with its summary index entry and, if it was parsed, search keys
+_LoadResult = tuple[CaseSummary, IndexEntry | None, IndexEntry | None]
+
+
 class CaseRepo:
     TITLE_RE = re.compile(r"^\[(?P<sf>\d+)\] (?P<title>.+)$")
+    INDEX_FILE = ".kase-index.json"
+    SEARCH_INDEX_FILE = ".kase-search-index.json"
+    # Least seconds between checks for changes where the directory has to be polled
+    WATCH_INTERVAL = 2.0
 
-    def __init__(self, case_dir: str):
+    def __init__(self, case_dir: str, use_index: bool = True, jobs: int = 1):
         self.case_dir: str = os.path.expanduser(case_dir)
+        self.index: CaseIndex | None = None
+        search_index: CaseIndex | None = None
+        if use_index:
+            self.index = CaseIndex(Path(self.case_dir) / self.INDEX_FILE)
+            search_index = CaseIndex(Path(self.case_dir) / self.SEARCH_INDEX_FILE)
+        self.details = CaseDetails(search_index)
+        self.jobs = jobs
+        # Files that could not be loaded during the last iteration of cases
+        self.errors: list[CaseLoadError] = []
 
     @property
     def metadata(self) -> list[Path]:
         return [Path(f) for f in glob(f"{self.case_dir}/*/case.json")]
 
     @property
-    def cases(self) -> Iterable[Case]:
-        for meta in self.metadata:
-            yield self._load_meta(meta)
+    def case_ids(self) -> set[str]:
+        """Case numbers of the cases in the repo, without loading any of them
+
+        Cases are kept in a folder named after their case number, so these
+        are just the names of the folders in the case directory. A folder is
+        counted even if its case.json is missing or broken, as importing the
+        case would still write into it.
+        """
+        try:
+            with os.scandir(self.case_dir) as entries:
+                return {
+                    entry.name
+                    for entry in entries
+                    if entry.is_dir() and not entry.name.startswith(".")
+                }
+        except OSError:
+            return set()
+
+    @property
+    def cases(self) -> Iterable[CaseSummary]:
+        """Load a summary of every case in the repo, in metadata order
+
+        Summaries have everything but the description, which is only read
+        when it is used. With jobs > 1 the files are read on a thread pool so that the
+        per-file latency of network filesystems overlaps. Cases that fail to
+        load are skipped and recorded in errors.
+        """
+        self.errors = []
+        index = self.index
+        if index is not None:
+            index.load()
+        fresh: dict[str, IndexEntry] = {}
+        # Search keys of the cases that had to be parsed
+        changed: dict[str, IndexEntry] = {}
+        with profiling.phase("discovery"):
+            metadata = self.metadata
+        for meta, result in _ordered_map(self._try_load, metadata, self.jobs):
+            if isinstance(result, CaseLoadError):
+                self.errors.append(result)
+                continue
+            case, entry, keys = result
+            if entry is not None:
+                fresh[meta.parent.name] = entry
+            if keys is not None:
+                changed[meta.parent.name] = keys
+            yield case
+        if index is not None and fresh != index.entries:
+            index.entries = fresh
+            index.save()
+            self.details.update(fresh, changed)
+        elif index is not None and self.details.is_outdated(index):
+            self.details.update(fresh, changed)
+
+    def _try_load(self, meta: Path) -> _LoadResult | CaseLoadError:
+        try:
+            return self._load_entry(meta)
+        except (OSError, ValueError, TypeError) as e:
+            return CaseLoadError(meta, e)
+
+    def _load_entry(self, meta: Path) -> _LoadResult:
+        if self.index is None:
+            data = self._load_meta(meta).model_dump(include=set(SUMMARY_FIELDS))
+            return self._summary(meta.parent, data), None, None
+        # Only case.json files whose mtime or size changed since the last run
+        # are parsed and validated; the rest are rebuilt from the index.
+        stat = meta.stat()
+        if (entry := self.index.lookup(meta.parent.name, stat)) is not None:
+            return (
+                self._summary(meta.parent, entry["data"], stat.st_mtime_ns),
+                entry,
+                None,
+            )
+        case = self._load_meta(meta)
+        entry = self.index.make_entry(
+            stat, case.model_dump(include=set(SUMMARY_FIELDS))
+        )
+        keys = self.index.make_entry(stat, case.search_keys._asdict())
+        return self._summary(meta.parent, entry["data"], stat.st_mtime_ns), entry, keys
+
+    def _summary(
+        self, folder: Path, data: dict[str, str], mtime_ns: int | None = None
+    ) -> CaseSummary:
+        return CaseSummary(
+            folder,
+            data["title"],
+            data["sf"],
+            data["lp"],
+            self.details,
+            mtime_ns=mtime_ns,
+        )
 
     @staticmethod
-    def _load_meta(meta: Path) -> Case:
-        with meta.open("r") as f:
+    def _load_meta(meta: Path) -> "Case":
+        from .model import Case
+
+        with profiling.phase("parse"), meta.open("r") as f:
             data = json.load(f)
+        with profiling.phase("validate"):
             return Case(path=meta.parent, **data)
 
-    def open_case(self, case_folder: Path) -> Case:
+    def watch(
+        self,
+        cases: Iterable[ListedCase],
+        stop: threading.Event,
+        interval: float = WATCH_INTERVAL,
+    ) -> Iterator[list[CaseChange]]:
+        """Yield the cases added, changed or removed since cases were listed
+
+        Blocks between batches of changes until stop is set, so it is meant
+        to run on a thread of its own. Changes are noticed through inotify
+        where possible and otherwise by polling the modification times of
+        all case.json files, every interval seconds or less often if that
+        takes long. Cases that fail to load are skipped until they change
+        again.
+        """
+        from .watch import Poller, open_watcher
+
+        # The modification times the cases were listed with
+        known = {case.path.name: case.mtime_ns for case in cases}
+        watcher = open_watcher(self.case_dir, interval)
+        # Inotify only hears of changes from now on, so catch up with those
+        # made since the listing. The first poll does that for a poller.
+        if not isinstance(watcher, Poller) and (changes := self._check(known, None)):
+            yield changes
+        for names in watcher.changes(stop):
+            if changes := self._check(known, names):
+                yield changes
+
+    def _check(
+        self, known: dict[str, int | None], names: Iterable[str] | None
+    ) -> list[CaseChange]:
+        """Changes to the named case folders, or all, updating known"""
+        if names is None:
+            names = set(known) | {meta.parent.name for meta in self.metadata}
+        changes: list[CaseChange] = []
+        for name in sorted(names):
+            meta = Path(self.case_dir) / name / "case.json"
+            try:
+                mtime_ns = meta.stat().st_mtime_ns
+            except OSError:
+                if name in known:
+                    del known[name]
+                    changes.append(CaseChange(ChangeKind.removed, meta.parent, None))
+                continue
+            if name in known and known[name] == mtime_ns:
+                continue
+            try:
+                case = self._load_meta(meta)
+            except (OSError, ValueError, TypeError):
+                continue
+            kind = ChangeKind.changed if name in known else ChangeKind.added
+            known[name] = mtime_ns
+            changes.append(CaseChange(kind, meta.parent, case))
+        return changes
+
+    def open_case(self, case_folder: Path) -> "Case":
         return self._load_meta(case_folder / "case.json")
 
     def create_case(self, name: str, lp: str, description: str) -> bool:
+        from .model import Case
+
         match = self.TITLE_RE.match(name)
         if not match:
             return False
@@ -86,3 +444,20 @@ class CaseRepo:
             desc=description,
         )
         return case.write_metadata(clobber=False)
+
+
+def _ordered_map(
+    fn: Callable[[T], R], items: list[T], jobs: int
+) -> Iterator[tuple[T, R]]:
+    """Yield (item, fn(item)) in input order, running fn on up to jobs threads"""
+    if jobs <= 1:
+        for item in items:
+            yield item, fn(item)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        yield from zip(items, pool.map(fn, items), strict=True)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,19 +1,22 @@
-import importlib.metadata
+import os
 import textwrap
+from collections.abc import Callable
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import typer
-from rich.console import Console
 
-from kase.tui.importer import ImporterApp
+from .headless import ConflictPolicy, ImportSummary, OutputFormat
 
-from .tui.init import InitApp
-from .tui.query import QueryApp
+# Commands import what they use themselves: `kase shell` and `kase --version`
+# run in every new shell and should not pay for the TUI, pydantic or rapidfuzz
+if TYPE_CHECKING:
+    from rich.console import Console
 
-DEFAULT_CASE_DIR = "~/cases"
+    from .cases import CaseRepo, ListedCase
+    from .model import Case
 
-console = Console()
+DEFAULT_CASE_DIR = "~/cases"
 
 main = typer.Typer()
 
@@ -34,6 +37,55 @@ def query(
             envvar="CASE_DIR",
         ),
     ] = DEFAULT_CASE_DIR,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="Number of threads used to load case files. "
+            "Values above 1 help on network filesystems.",
+            envvar="KASE_JOBS",
+        ),
+    ] = 1,
+    max_results: Annotated[
+        int | None,
+        typer.Option(
+            min=1,
+            help="Show only this many of the best matches, ranked by score, "
+            "instead of every match.",
+            envvar="KASE_MAX_RESULTS",
+        ),
+    ] = None,
+    print_matches: Annotated[
+        bool,
+        typer.Option(
+            "--print",
+            "--filter",
+            help="Print the cases matching INITIAL_PROMPT, best first, "
+            "instead of opening the fuzzy finder.",
+        ),
+    ] = False,
+    output: Annotated[
+        OutputFormat,
+        typer.Option(
+            "--format",
+            help="Output format for --print: one case per line, JSON lines, "
+            "or NUL-terminated records.",
+        ),
+    ] = OutputFormat.plain,
+    limit: Annotated[
+        int | None,
+        typer.Option(min=1, help="Print at most this many cases with --print."),
+    ] = None,
+    latency_trace: Annotated[
+        Path | None,
+        typer.Option(
+            dir_okay=False,
+            help="Append the latency from each keystroke until its matches are "
+            "shown to this file, as JSON lines. Press F12 to show the latency "
+            "percentiles on screen.",
+            envvar="KASE_LATENCY_TRACE",
+        ),
+    ] = None,
 ):
     """
     Pop up a fuzzy finder to select a case to cd into.
@@ -41,9 +93,23 @@ def query(
     For the cd functionality to work, the shell integration
     must have been set up.
     """
+    if print_matches:
+        _print_matches(
+            case_dir, jobs, initial_prompt, limit, output, lambda case: str(case.path)
+        )
+        return
+
+    from .tui.query import QueryApp
 
-    app = QueryApp(initial_prompt=initial_prompt, case_dir=case_dir)
+    app = QueryApp(
+        initial_prompt=initial_prompt,
+        case_dir=case_dir,
+        jobs=jobs,
+        max_results=max_results,
+        latency_trace=latency_trace,
+    )
     case = app.run()
+    _report_load_errors(app.repo)
     if case is not None:
         print(str(case.path))
 
@@ -70,15 +136,117 @@ def punch(
             help="Maximum length of the case title to display.",
         ),
     ] = 50,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="Number of threads used to load case files. "
+            "Values above 1 help on network filesystems.",
+            envvar="KASE_JOBS",
+        ),
+    ] = 1,
+    max_results: Annotated[
+        int | None,
+        typer.Option(
+            min=1,
+            help="Show only this many of the best matches, ranked by score, "
+            "instead of every match.",
+            envvar="KASE_MAX_RESULTS",
+        ),
+    ] = None,
+    print_matches: Annotated[
+        bool,
+        typer.Option(
+            "--print",
+            "--filter",
+            help="Print the cases matching INITIAL_PROMPT, best first, "
+            "instead of opening the fuzzy finder.",
+        ),
+    ] = False,
+    output: Annotated[
+        OutputFormat,
+        typer.Option(
+            "--format",
+            help="Output format for --print: one case per line, JSON lines, "
+            "or NUL-terminated records.",
+        ),
+    ] = OutputFormat.plain,
+    limit: Annotated[
+        int | None,
+        typer.Option(min=1, help="Print at most this many cases with --print."),
+    ] = None,
+    latency_trace: Annotated[
+        Path | None,
+        typer.Option(
+            dir_okay=False,
+            help="Append the latency from each keystroke until its matches are "
+            "shown to this file, as JSON lines. Press F12 to show the latency "
+            "percentiles on screen.",
+            envvar="KASE_LATENCY_TRACE",
+        ),
+    ] = None,
 ):
-    app = QueryApp(initial_prompt=initial_prompt, case_dir=case_dir)
-    case = app.run()
-    if case is None:
+    if print_matches:
+        _print_matches(
+            case_dir,
+            jobs,
+            initial_prompt,
+            limit,
+            output,
+            lambda case: _punch_line(case, max_length),
+        )
         return
+
+    from .tui.query import QueryApp
+
+    app = QueryApp(
+        initial_prompt=initial_prompt,
+        case_dir=case_dir,
+        jobs=jobs,
+        max_results=max_results,
+        latency_trace=latency_trace,
+    )
+    case = app.run()
+    _report_load_errors(app.repo)
+    if case is not None:
+        print(_punch_line(case, max_length))
+
+
+def _print_matches(
+    case_dir: str,
+    jobs: int,
+    query: str,
+    limit: int | None,
+    output: OutputFormat,
+    describe: Callable[["ListedCase"], str],
+) -> None:
+    from .daemon import open_repo
+    from .headless import find_cases, print_cases
+
+    repo = open_repo(case_dir, jobs=jobs)
+    print_cases(find_cases(repo, query, limit), output, describe)
+    _report_load_errors(repo)
+
+
+def _punch_line(case: "ListedCase", max_length: int) -> str:
     title = case.title
     if len(title) > max_length:
         title = title[:max_length] + "..."
-    print(f"[{case.sf}] {title}")
+    return f"[{case.sf}] {title}"
+
+
+def _report_load_errors(repo: "CaseRepo") -> None:
+    if not repo.errors:
+        return
+    err_console = _console(stderr=True)
+    for error in repo.errors:
+        err_console.print(f"[yellow]Skipped {error.path}: {error.error}[/]")
+
+
+def _console(stderr: bool = False) -> "Console":
+    from rich.console import Console
+
+    return Console(stderr=stderr)
 
 
 @main.command(name="import")
@@ -106,30 +274,108 @@ def import_case(
             envvar="CASE_DIR",
         ),
     ] = DEFAULT_CASE_DIR,
+    import_all: Annotated[
+        bool,
+        typer.Option(
+            "--all",
+            help="Import every case in CSV_FILE without opening the fuzzy finder.",
+        ),
+    ] = False,
+    on_conflict: Annotated[
+        ConflictPolicy | None,
+        typer.Option(
+            help="What to do with cases that already have a case.json: keep "
+            "them, overwrite them, or overwrite them if CSV_FILE is newer. "
+            "Asks for each case if not given, unless --all is passed, which "
+            "skips them.",
+        ),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="Number of threads used to write case files with --all or "
+            "--on-conflict. Values above 1 help on network filesystems.",
+            envvar="KASE_JOBS",
+        ),
+    ] = 4,
 ):
-    app = ImporterApp(
-        case_dir=case_dir,
-        csv_file=csv_file,
-        initial_prompt=initial_prompt,
+    """
+    Import cases from a CSV export of a Salesforce report.
+
+    Pick the cases to import in a fuzzy finder, or import all of them with
+    --all.
+    """
+    from .headless import import_cases
+
+    console = _console()
+    if import_all:
+        from .importer import SalesforceCSV
+
+        importer = SalesforceCSV(csv_file, Path(os.path.expanduser(case_dir)))
+        try:
+            cases = list(importer.cases())
+        except ValueError as e:
+            _console(stderr=True).print(f"[red]{csv_file}: {e}[/]")
+            raise typer.Exit(1) from e
+    else:
+        from .tui.importer import ImporterApp
+
+        app = ImporterApp(
+            case_dir=case_dir,
+            csv_file=csv_file,
+            initial_prompt=initial_prompt,
+        )
+        selected = app.run()
+        if not selected:
+            return
+        try:
+            cases = [case.load() for case in selected]
+        except (OSError, ValueError) as e:
+            _console(stderr=True).print(f"[red]{csv_file}: {e}[/]")
+            raise typer.Exit(1) from e
+        if on_conflict is None:
+            _confirm_import(console, cases)
+            return
+    summary = import_cases(
+        cases,
+        on_conflict or ConflictPolicy.skip,
+        exported_ns=csv_file.stat().st_mtime_ns,
+        jobs=jobs,
     )
-    if cases := app.run():
-        for case in cases:
-            metadata_file = case.path / "case.json"
-            case_exists = metadata_file.exists()
-            if case_exists:
-                console.print(
-                    f"[yellow]{case.sf} already exists at {metadata_file}.[/]"
-                )
-                if not typer.confirm(
-                    f"Overwrite case.json for {case.sf}?", default=False
-                ):
-                    console.print(f"[italic yellow]Skipping {case.sf}.[/]")
-                    continue
-                console.print(f"[bold magenta]Overwriting {case.sf}...[/]")
-                case.write_metadata(clobber=True)
+    _report_import(console, summary)
+    if summary.failures:
+        raise typer.Exit(1)
+
+
+def _confirm_import(console: "Console", cases: list["Case"]) -> None:
+    """Write the selected cases, asking before overwriting any"""
+    for case in cases:
+        metadata_file = case.path / "case.json"
+        case_exists = metadata_file.exists()
+        if case_exists:
+            console.print(f"[yellow]{case.sf} already exists at {metadata_file}.[/]")
+            if not typer.confirm(f"Overwrite case.json for {case.sf}?", default=False):
+                console.print(f"[italic yellow]Skipping {case.sf}.[/]")
                 continue
-            console.print(f"[bold green]Creating {case.sf}...[/]")
-            case.write_metadata()
+            console.print(f"[bold magenta]Overwriting {case.sf}...[/]")
+            case.write_metadata(clobber=True)
+            continue
+        console.print(f"[bold green]Creating {case.sf}...[/]")
+        case.write_metadata()
+
+
+def _report_import(console: "Console", summary: ImportSummary) -> None:
+    err_console = _console(stderr=True)
+    for failure in summary.failures:
+        err_console.print(f"[red]Failed to import {failure.sf}: {failure.error}[/]")
+    counts = ", ".join(
+        f"{count} {outcome.value}" for outcome, count in summary.counts.items()
+    )
+    console.print(
+        f"Processed {summary.total} cases in {summary.elapsed:.2f}s "
+        f"({summary.rate:.0f} cases/s): {counts}"
+    )
 
 
 @main.command()
@@ -148,11 +394,135 @@ def init(
 
     Creates the directory if it does not exist.
     """
+    from .tui.init import InitApp
+
     app = InitApp(case_dir)
     if result := app.run():
         print(result)
 
 
+@main.command()
+def bench(
+    sizes: Annotated[
+        list[int] | None,
+        typer.Option(
+            "--size",
+            min=1,
+            help="Number of synthetic cases to benchmark with. May be repeated; "
+            "defaults to 1000, 10000 and 100000.",
+        ),
+    ] = None,
+    desc_length: Annotated[
+        int,
+        typer.Option(min=0, help="Length of each case description in characters."),
+    ] = 1000,
+    query: Annotated[
+        str,
+        typer.Option(help="Query typed one keystroke at a time to time filtering."),
+    ] = "kernel panic",
+    rounds: Annotated[
+        int,
+        typer.Option(min=1, help="Times to type and delete the query."),
+    ] = 3,
+    output: Annotated[
+        Path | None,
+        typer.Option(
+            dir_okay=False,
+            help="Write the results as JSON to this file instead of stdout.",
+        ),
+    ] = None,
+):
+    """
+    Benchmark kase on synthetic case repositories and CSV exports.
+
+    Reports load times, filter latency per keystroke, time to first paint of
+    the fuzzy finder and peak memory for each size, as JSON.
+    """
+    import json
+
+    from . import bench as benchmarks
+
+    err_console = _console(stderr=True)
+
+    def progress(result: dict) -> None:
+        latency = result["filter_latency_s"]
+        err_console.print(
+            f"[bold]{result['cases']}[/] cases: "
+            f"load {result['repo_load_cold_s']:.2f}s cold, "
+            f"{result['repo_load_warm_s']:.2f}s warm, "
+            f"{result['repo_load_peak_mb']:.1f}MB; "
+            f"filter p50 {latency['p50'] * 1000:.1f}ms, "
+            f"p99 {latency['p99'] * 1000:.1f}ms; "
+            f"first paint {result['first_paint_s']:.2f}s"
+        )
+
+    results = benchmarks.run(
+        sizes or benchmarks.DEFAULT_SIZES, desc_length, query, rounds, progress
+    )
+    report = json.dumps(results, indent=2)
+    if output is None:
+        print(report)
+    else:
+        output.write_text(report + "\n")
+
+
+@main.command()
+def daemon(
+    case_dir: Annotated[
+        str,
+        typer.Option(
+            help="Directory containing case files."
+            "Defaults to $CASE_DIR environment variable or ~/cases",
+            envvar="CASE_DIR",
+        ),
+    ] = DEFAULT_CASE_DIR,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="Number of threads used to load case files. "
+            "Values above 1 help on network filesystems.",
+            envvar="KASE_JOBS",
+        ),
+    ] = 1,
+    refresh_interval: Annotated[
+        float,
+        typer.Option(
+            min=0.1,
+            help="Seconds between checks of the case directory for changes, "
+            "where it can't be watched with inotify.",
+        ),
+    ] = 2.0,
+):
+    """
+    Keep the cases in memory and serve them to other kase commands.
+
+    While the daemon runs, `kase query` and `kase punch`, with or without
+    --print, get the cases of CASE_DIR from it instead of reading every
+    case file. Stop it with Ctrl+C.
+    """
+    import signal
+
+    from . import daemon as case_daemon
+
+    # Stop as on Ctrl+C, removing the socket, when the service manager says so
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    err_console = _console(stderr=True)
+
+    def ready(path: Path) -> None:
+        err_console.print(f"Serving the cases in {case_dir} on {path}")
+
+    try:
+        case_daemon.serve(
+            case_dir, jobs, refresh_interval=refresh_interval, ready=ready
+        )
+    except (FileExistsError, PermissionError) as e:
+        err_console.print(f"[red]{e}[/]")
+        raise typer.Exit(1) from e
+    except KeyboardInterrupt:
+        pass
+
+
 @main.command()
 def shell(
     jump_cmd: Annotated[
@@ -183,6 +553,8 @@ def shell(
 
 def version_callback(print_version: bool):
     if print_version:
+        import importlib.metadata
+
         print(f"kase {importlib.metadata.version('kase')}")
         raise typer.Exit()
 
@@ -196,6 +568,19 @@ def default(
             help="Print the version and exit.", callback=version_callback, is_eager=True
         ),
     ] = False,
+    profile: Annotated[
+        Path | None,
+        typer.Option(
+            dir_okay=False,
+            help="Profile the command and write the cProfile stats and the time "
+            "taken by each phase of loading and searching cases to this file.",
+            envvar="KASE_PROFILE",
+        ),
+    ] = None,
 ):
+    if profile is not None:
+        from . import profiling
+
+        ctx.with_resource(profiling.profile(profile))
     if ctx.invoked_subcommand is None:
         query()
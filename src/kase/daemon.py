@@ -0,0 +1,294 @@
+"""A resident process serving the cases of a case directory
+
+`kase daemon` keeps the case summaries of one case directory and their search
+engine in memory and answers list and search requests on a Unix socket, so
+that a new `kase query` does not have to read the repo again. The daemon
+applies the cases CaseRepo.watch reports as added, changed or removed, so
+only the case.json files that changed are read again.
+
+The protocol is one JSON request line per connection, answered by one JSON
+line:
+
+    {"op": "list"}
+    {"op": "search", "query": "kernel panic", "limit": 10}
+
+A search returns the best matches first. Each search is scored on its own,
+whatever other clients asked before. Both are answered with
+{"version": ..., "cases": [...], "errors": [...]}, or
+{"version": ..., "error": "..."} if the request is not understood.
+
+Clients use a DaemonRepo, which loads the cases itself whenever the daemon
+cannot be reached.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from .cases import CaseChange, CaseLoadError, CaseRepo, CaseSummary, ListedCase
+from .search import CaseSearch
+
+PROTOCOL_VERSION = 1
+# Least seconds between checks for changes where the directory has to be polled
+REFRESH_INTERVAL = 2.0
+# Seconds a client waits for the daemon before loading the cases itself
+TIMEOUT = 5.0
+
+
+class DaemonUnavailable(Exception):
+    """The daemon could not be reached or did not give a usable answer"""
+
+
+def socket_path(case_dir: str) -> Path:
+    """The socket a daemon for case_dir listens on
+
+    Sockets live in $XDG_RUNTIME_DIR, or else in a directory in the temporary
+    directory that only the user can access, and are named after a hash of
+    the resolved case directory.
+    """
+    resolved = os.path.realpath(os.path.expanduser(case_dir))
+    name = hashlib.sha256(resolved.encode()).hexdigest()[:16]
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        folder = Path(runtime_dir) / "kase"
+    else:
+        folder = Path(tempfile.gettempdir()) / f"kase-{os.getuid()}"
+    return folder / f"{name}.sock"
+
+
+def open_repo(case_dir: str, jobs: int = 1) -> CaseRepo:
+    """A DaemonRepo if a daemon is serving case_dir, otherwise a CaseRepo"""
+    path = socket_path(case_dir)
+    if path.exists() and _is_private(path.parent):
+        return DaemonRepo(case_dir, jobs=jobs, socket=path)
+    return CaseRepo(case_dir, jobs=jobs)
+
+
+def _is_private(folder: Path) -> bool:
+    """Whether only the user can put a socket in folder"""
+    try:
+        stat = folder.stat()
+    except OSError:
+        return False
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _is_serving(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def request(path: Path, payload: dict[str, Any]) -> dict[str, Any]:
+    """Send one request to the daemon listening on path and return its answer"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(TIMEOUT)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        raise DaemonUnavailable(f"{path}: {e}") from e
+    if not isinstance(response, dict) or response.get("version") != PROTOCOL_VERSION:
+        raise DaemonUnavailable(f"{path}: unsupported response")
+    if "error" in response:
+        raise DaemonUnavailable(f"{path}: {response['error']}")
+    return response
+
+
+class DaemonRepo(CaseRepo):
+    """A CaseRepo whose cases are served by a running daemon
+
+    Falls back to loading the cases itself if the daemon can't be reached.
+    The cases are summaries just like those of a CaseRepo, whose descriptions
+    and search keys are read from the case directory when needed.
+    """
+
+    def __init__(self, case_dir: str, jobs: int = 1, socket: Path | None = None):
+        super().__init__(case_dir, jobs=jobs)
+        self.socket = socket or socket_path(case_dir)
+
+    @property
+    def cases(self) -> Iterable[CaseSummary]:
+        try:
+            response = request(self.socket, {"op": "list"})
+        except DaemonUnavailable:
+            yield from super().cases
+            return
+        yield from self._read_response(response)
+
+    def search(self, query: str, limit: int | None = None) -> list[CaseSummary]:
+        """Cases matching query, best first, as headless.find_cases
+
+        Raises DaemonUnavailable if the daemon can't be reached.
+        """
+        response = request(
+            self.socket, {"op": "search", "query": query, "limit": limit}
+        )
+        return list(self._read_response(response))
+
+    def _read_response(self, response: dict[str, Any]) -> Iterator[CaseSummary]:
+        self.errors = [
+            CaseLoadError(Path(path), Exception(message))
+            for path, message in response["errors"]
+        ]
+        for data in response["cases"]:
+            yield self._summary(
+                Path(data.pop("path")), data, mtime_ns=data.pop("mtime_ns")
+            )
+
+
+class CaseDaemon:
+    """The cases of a case directory and a search engine over them
+
+    The cases are loaded once, after which apply_changes() updates just the
+    cases that changed. Requests may be handled on several threads while
+    that happens.
+    """
+
+    def __init__(self, case_dir: str, jobs: int = 1):
+        self.repo = CaseRepo(case_dir, jobs=jobs)
+        self.cases: list[ListedCase] = list(self.repo.cases)
+        self.errors: list[CaseLoadError] = self.repo.errors
+        self.search = CaseSearch(self.cases)
+        self._lock = threading.Lock()
+
+    def apply_changes(self, changes: Iterable[CaseChange]) -> None:
+        """Bring the cases up to date with changes reported by CaseRepo.watch"""
+        changes = list(changes)
+        paths = {change.path for change in changes}
+        updated = {
+            change.path: change.case for change in changes if change.case is not None
+        }
+        with self._lock:
+            # Removed cases, and cases whose number was edited, go away
+            # under their old number
+            removed = {
+                case.sf
+                for case in self.cases
+                if case.path in paths
+                and (case.path not in updated or updated[case.path].sf != case.sf)
+            }
+            cases: list[ListedCase] = []
+            for case in self.cases:
+                if case.path not in paths:
+                    cases.append(case)
+                elif case.path in updated:
+                    cases.append(updated.pop(case.path))
+            cases.extend(updated.values())
+            # A case that loads again, or is gone, no longer has an error
+            errors = [error for error in self.errors if error.path.parent not in paths]
+            self.search.remove(removed)
+            self.search.add(
+                change.case for change in changes if change.case is not None
+            )
+            self.cases, self.errors = cases, errors
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            cases, errors, search = self.cases, self.errors, self.search
+        op = request.get("op")
+        if op == "list":
+            matches = cases
+        elif op == "search":
+            query = str(request.get("query") or "")
+            limit = request.get("limit")
+            if not query:
+                matches = cases[:limit]
+            else:
+                matches = search.filter(query, limit=limit or len(search), refine=False)
+        else:
+            return {"version": PROTOCOL_VERSION, "error": f"unknown op {op!r}"}
+        return {
+            "version": PROTOCOL_VERSION,
+            "cases": [_encode(case) for case in matches],
+            "errors": [[str(error.path), str(error.error)] for error in errors],
+        }
+
+
+def _encode(case: ListedCase) -> dict[str, Any]:
+    return {
+        "path": str(case.path),
+        "title": case.title,
+        "sf": case.sf,
+        "lp": case.lp,
+        "mtime_ns": case.mtime_ns,
+    }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        daemon: CaseDaemon = self.server.case_daemon  # type: ignore[attr-defined]
+        line = self.rfile.readline()
+        if not line:
+            # A client checking whether the daemon is up
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+            response = daemon.handle(request)
+        except (ValueError, TypeError) as e:
+            response = {"version": PROTOCOL_VERSION, "error": str(e)}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def make_server(daemon: CaseDaemon, path: Path) -> socketserver.BaseServer:
+    """A server answering requests for daemon on the socket at path
+
+    Refuses to replace the socket of a daemon that is still running, but
+    removes one left behind by a daemon that died.
+    """
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not _is_private(path.parent):
+        raise PermissionError(f"{path.parent} is writable by other users")
+    if _is_serving(path):
+        raise FileExistsError(f"A kase daemon is already listening on {path}")
+    path.unlink(missing_ok=True)
+    server = socketserver.ThreadingUnixStreamServer(str(path), _Handler)
+    server.daemon_threads = True
+    server.case_daemon = daemon  # type: ignore[attr-defined]
+    return server
+
+
+def serve(
+    case_dir: str,
+    jobs: int = 1,
+    path: Path | None = None,
+    refresh_interval: float = REFRESH_INTERVAL,
+    ready: Callable[[Path], None] | None = None,
+) -> None:
+    """Serve the cases of case_dir until interrupted
+
+    ready is called with the socket path once the cases are loaded and the
+    daemon accepts requests.
+    """
+    path = path or socket_path(case_dir)
+    daemon = CaseDaemon(case_dir, jobs=jobs)
+    server = make_server(daemon, path)
+    stop = threading.Event()
+
+    def watch() -> None:
+        for changes in daemon.repo.watch(daemon.cases, stop, refresh_interval):
+            daemon.apply_changes(changes)
+
+    watcher = threading.Thread(target=watch, name="kase-watch", daemon=True)
+    watcher.start()
+    if ready is not None:
+        ready(path)
+    try:
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
+        path.unlink(missing_ok=True)
@@ -0,0 +1,156 @@
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from enum import Enum
+from itertools import islice
+from typing import TYPE_CHECKING, NamedTuple, TextIO
+
+# The enums are needed to declare the CLI options, so keep this module cheap
+# to import and leave loading the cases to the functions that use them
+if TYPE_CHECKING:
+    from .cases import CaseRepo, ListedCase
+    from .model import Case
+
+
+class OutputFormat(str, Enum):
+    plain = "plain"
+    json = "json"
+    nul = "nul"
+
+
+class ConflictPolicy(str, Enum):
+    """What an import does with a case that already has a case.json"""
+
+    skip = "skip"
+    overwrite = "overwrite"
+    # Overwrite only case.json files older than the export
+    newer = "newer"
+
+
+class ImportOutcome(str, Enum):
+    created = "created"
+    overwritten = "overwritten"
+    skipped = "skipped"
+    failed = "failed"
+
+
+class ImportFailure(NamedTuple):
+    sf: str
+    error: Exception
+
+
+class ImportSummary(NamedTuple):
+    counts: dict[ImportOutcome, int]
+    failures: list[ImportFailure]
+    # Seconds the import took
+    elapsed: float
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def rate(self) -> float:
+        """Cases handled per second"""
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def find_cases(
+    repo: "CaseRepo", query: str, limit: int | None = None
+) -> Iterator["ListedCase"]:
+    """Cases matching query, best first, scored as in the TUI
+
+    Without a query every case is listed, in repo order, as it is loaded.
+    A DaemonRepo asks its daemon, unless it can't be reached.
+    """
+    from .daemon import DaemonRepo, DaemonUnavailable
+    from .search import CaseSearch
+
+    if isinstance(repo, DaemonRepo):
+        try:
+            matches = repo.search(query, limit)
+        except DaemonUnavailable:
+            pass
+        else:
+            yield from matches
+            return
+    if not query:
+        yield from islice(repo.cases, limit)
+        return
+    search = CaseSearch(repo.cases)
+    yield from search.filter(query, limit=limit or len(search))
+
+
+def print_cases(
+    cases: Iterable["ListedCase"],
+    output: OutputFormat,
+    describe: Callable[["ListedCase"], str],
+    file: TextIO | None = None,
+) -> None:
+    """Write one record per case, describing it with describe unless as JSON"""
+    for case in cases:
+        if output is OutputFormat.json:
+            record = {
+                "sf": case.sf,
+                "title": case.title,
+                "lp": case.lp,
+                "path": str(case.path),
+            }
+            print(json.dumps(record), file=file)
+        else:
+            end = "\0" if output is OutputFormat.nul else "\n"
+            print(describe(case), end=end, file=file)
+
+
+def import_cases(
+    cases: Iterable["Case"],
+    on_conflict: ConflictPolicy,
+    exported_ns: int | None = None,
+    jobs: int = 1,
+) -> ImportSummary:
+    """Write the case.json of every case, on up to jobs threads
+
+    Of several cases with the same case number the last one is written, as
+    in the importer. exported_ns is the modification time of the export
+    that ConflictPolicy.newer compares existing case.json files to; without
+    it they are all kept. Cases that can't be written are counted as failed
+    instead of stopping the import.
+    """
+    from .cases import _ordered_map
+
+    start = time.perf_counter()
+    unique = list({case.sf: case for case in cases}.values())
+
+    def write(case: "Case") -> ImportOutcome | Exception:
+        try:
+            return _write_case(case, on_conflict, exported_ns)
+        except (OSError, ValueError) as e:
+            return e
+
+    counts = dict.fromkeys(ImportOutcome, 0)
+    failures: list[ImportFailure] = []
+    for case, result in _ordered_map(write, unique, jobs):
+        if isinstance(result, Exception):
+            failures.append(ImportFailure(case.sf, result))
+            result = ImportOutcome.failed
+        counts[result] += 1
+    return ImportSummary(counts, failures, time.perf_counter() - start)
+
+
+def _write_case(
+    case: "Case", on_conflict: ConflictPolicy, exported_ns: int | None
+) -> ImportOutcome:
+    try:
+        mtime_ns = (case.path / "case.json").stat().st_mtime_ns
+    except FileNotFoundError:
+        # A concurrent import may still have created it in the meantime
+        if case.write_metadata():
+            return ImportOutcome.created
+        return ImportOutcome.skipped
+    if on_conflict is ConflictPolicy.skip or (
+        on_conflict is ConflictPolicy.newer
+        and (exported_ns is None or mtime_ns >= exported_ns)
+    ):
+        return ImportOutcome.skipped
+    case.write_metadata(clobber=True)
+    return ImportOutcome.overwritten
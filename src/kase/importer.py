@@ -1,8 +1,14 @@
+import codecs
 import csv
-from collections.abc import Iterable
+import os
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import BinaryIO
 
-from .cases import Case
+from . import profiling
+from .cases import _CaseFolder
+from .model import Case
+from .search import SearchKeys
 
 
 class SalesforceCSV:
@@ -12,10 +18,16 @@ class SalesforceCSV:
     """
 
     REQUIRED_COLUMNS = ("Case Number", "Subject", "Description")
+    # Salesforce exports UTF-8, with a byte order mark if saved from Excel
+    ENCODING = "utf-8-sig"
+    # Characters of each description that summaries() keeps to search by
+    SEARCH_PREFIX = 2000
 
     def __init__(self, csv_file: Path, case_dir: Path):
         self.csv_file = csv_file
         self.case_dir = case_dir
+        # The required columns and their index, once the header is read
+        self._columns: list[tuple[str, int]] = []
 
     def _validate_headers(self, fieldnames: list[str] | None) -> None:
         if not fieldnames:
@@ -28,7 +40,9 @@ class SalesforceCSV:
                 f"CSV file is missing required column(s): {', '.join(missing)}"
             )
 
-    def _validate_row(self, row: dict[str, str], line_number: int) -> dict[str, str]:
+    def _validate_row(
+        self, row: dict[str, str | None], line_number: int
+    ) -> dict[str, str]:
         normalized: dict[str, str] = {}
         missing_values: list[str] = []
         for column in self.REQUIRED_COLUMNS:
@@ -45,14 +59,147 @@ class SalesforceCSV:
         return normalized
 
     def cases(self) -> Iterable[Case]:
-        with open(self.csv_file) as f:
-            reader = csv.DictReader(f)
-            self._validate_headers(reader.fieldnames)
-            for line_number, row in enumerate(reader, start=2):
-                normalized = self._validate_row(row, line_number)
-                yield Case(
-                    sf=normalized["Case Number"],
-                    path=self.case_dir / normalized["Case Number"],
-                    title=normalized["Subject"],
-                    desc=normalized["Description"],
+        """The cases in the export, yielded as the rows are read
+
+        Only the required columns of a row are picked out, so the other
+        columns of a wide export are dropped as soon as each row is parsed.
+        """
+        for row, _, _ in self._rows():
+            with profiling.phase("validate"):
+                # The row was validated already, so the model doesn't have to be
+                case = Case.model_construct(
+                    path=self.case_dir / row["Case Number"],
+                    title=row["Subject"],
+                    desc=row["Description"],
+                    sf=row["Case Number"],
+                    lp="",
                 )
+            yield case
+
+    def summaries(self) -> Iterable["ExportedCase"]:
+        """The cases in the export, keeping at most the start of descriptions
+
+        For picking cases out of exports too big to hold in memory: each
+        case keeps the first SEARCH_PREFIX characters of its description to
+        be searched by, and the rest is read back from the export for the
+        cases that are previewed or imported.
+        """
+        stat = self.csv_file.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        for row, offset, line_number in self._rows():
+            yield ExportedCase(self, row, (version, offset, line_number))
+
+    def _rows(self) -> Iterator[tuple[dict[str, str], int, int]]:
+        """Validated rows with the offset and line number they start at"""
+        with self.csv_file.open("rb") as f:
+            lines = _Lines(f, self.ENCODING)
+            reader = csv.reader(lines)
+            header = next(reader, [])
+            self._validate_headers(header)
+            # Like csv.DictReader, the last of several columns with a name wins
+            indexes = {column: i for i, column in enumerate(header)}
+            self._columns = [
+                (column, indexes[column]) for column in self.REQUIRED_COLUMNS
+            ]
+            line_number = 1
+            while True:
+                offset = lines.offset
+                row = next(reader, None)
+                if row is None:
+                    return
+                if not row:
+                    # csv.DictReader skips blank lines without counting them
+                    continue
+                line_number += 1
+                yield self._project(row, line_number), offset, line_number
+
+    def _project(self, row: list[str], line_number: int) -> dict[str, str]:
+        return self._validate_row(
+            {
+                column: row[index] if index < len(row) else None
+                for column, index in self._columns
+            },
+            line_number,
+        )
+
+    def _read_desc(self, sf: str, location: "_RowLocation") -> str:
+        """The description of case sf, read back from its row of the export"""
+        version, offset, line_number = location
+        with self.csv_file.open("rb") as f:
+            stat = os.fstat(f.fileno())
+            if (stat.st_mtime_ns, stat.st_size) != version:
+                raise ValueError(f"{self.csv_file} changed since it was read")
+            f.seek(offset)
+            row = next(csv.reader(_Lines(f, self.ENCODING)), [])
+        normalized = self._project(row, line_number)
+        if normalized["Case Number"] != sf:
+            raise ValueError(f"Row {line_number} is no longer case {sf}")
+        return normalized["Description"]
+
+
+# The version of the export a row was read from, as its mtime and size, and
+# the offset and line number the row starts at
+_RowLocation = tuple[tuple[int, int], int, int]
+
+
+class ExportedCase(_CaseFolder):
+    """A case listed from an export, without the whole description kept
+
+    Cases are searched by the start of their description only. The full
+    description is read back from the export whenever it is asked for,
+    raising ValueError if the export changed since it was read. load() gives
+    the full Case, which is what should be written out.
+    """
+
+    def __init__(
+        self, export: SalesforceCSV, row: dict[str, str], location: _RowLocation
+    ):
+        self.sf = row["Case Number"]
+        self.path = export.case_dir / self.sf
+        self.title = row["Subject"]
+        self.lp = ""
+        self._export = export
+        self._location = location
+        desc = row["Description"]
+        prefix = desc[: export.SEARCH_PREFIX]
+        # Short descriptions are kept whole, as they cost no more than the prefix
+        self._desc = desc if prefix == desc else None
+        self.search_keys = SearchKeys.build(self.sf, self.lp, self.title, prefix)
+
+    def __repr__(self) -> str:
+        return f"ExportedCase(sf={self.sf!r}, title={self.title!r})"
+
+    @property
+    def desc(self) -> str:
+        if self._desc is not None:
+            return self._desc
+        return self._export._read_desc(self.sf, self._location)
+
+    def load(self) -> Case:
+        """The full case, with its description read back from the export"""
+        return Case.model_construct(
+            path=self.path, title=self.title, desc=self.desc, sf=self.sf, lp=self.lp
+        )
+
+
+class _Lines:
+    """Iterates over the decoded lines of a binary file
+
+    offset is the position in the file of the line that comes next, which
+    csv.reader doesn't keep track of.
+    """
+
+    def __init__(self, f: BinaryIO, encoding: str):
+        self._f = f
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self.offset = f.tell()
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        line = self._f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return self._decoder.decode(line)
@@ -0,0 +1,71 @@
+import contextlib
+import json
+import os
+from pathlib import Path
+from typing import TypedDict
+
+from . import profiling
+
+
+class IndexEntry(TypedDict):
+    mtime_ns: int
+    size: int
+    data: dict[str, str]
+
+
+class CaseIndex:
+    """Persistent cache of parsed case.json files
+
+    Entries are keyed by case folder name and remember the mtime and size of
+    the case.json they were read from, so an unchanged case costs a stat
+    instead of an open, a parse and a validation. The whole index is read
+    and written as a single JSON document.
+
+    What is cached for each case is up to the owner; CaseRepo keeps case
+    summaries and search keys in separate indexes so that listing cases never
+    has to read the descriptions.
+    """
+
+    VERSION = 3
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, IndexEntry] = {}
+
+    def load(self) -> None:
+        try:
+            with profiling.phase("index", self.path.name), self.path.open("r") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+            return
+        if not isinstance(payload, dict) or payload.get("version") != self.VERSION:
+            self.entries = {}
+            return
+        self.entries = payload.get("cases", {})
+
+    def save(self) -> bool:
+        """Atomically write the index, returning False if it could not be written"""
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with profiling.phase("index", self.path.name), tmp_path.open("w") as f:
+                json.dump({"version": self.VERSION, "cases": self.entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            return False
+        return True
+
+    def lookup(self, key: str, stat: os.stat_result) -> IndexEntry | None:
+        """Return the entry for key if it is still fresh for the given stat"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        return entry
+
+    @staticmethod
+    def make_entry(stat: os.stat_result, data: dict[str, str]) -> IndexEntry:
+        return IndexEntry(mtime_ns=stat.st_mtime_ns, size=stat.st_size, data=data)
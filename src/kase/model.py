@@ -0,0 +1,43 @@
+"""The full case model, as read from and written to case.json"""
+
+import functools
+import json
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from .cases import _CaseFolder
+from .search import SearchKeys
+
+
+class Case(_CaseFolder, BaseModel):
+    path: Path
+    title: str
+    desc: str
+    sf: str
+    lp: str = ""
+
+    def write_metadata(self, clobber: bool = False) -> bool:
+        # Check if case.json already exists - don't overwrite
+        metadata = self.model_dump()
+        path = metadata.pop("path")
+
+        metadata_file = path / "case.json"
+        if metadata_file.exists() and not clobber:
+            return False
+        # Create directory if it doesn't exist
+        if not path.exists():
+            path.mkdir(parents=True, exist_ok=True)
+        with metadata_file.open("w") as f:
+            json.dump(metadata, f, indent=4)
+        return True
+
+    @classmethod
+    def from_folder(cls, folder: Path) -> "Case":
+        with (folder / "case.json").open("r") as f:
+            data = json.load(f)
+            return cls(path=folder, **data)
+
+    @functools.cached_property
+    def search_keys(self) -> SearchKeys:
+        return SearchKeys.build(self.sf, self.lp, self.title, self.desc)
@@ -0,0 +1,119 @@
+"""Opt-in profiling of kase commands
+
+With --profile FILE (or KASE_PROFILE=FILE) a command runs under cProfile and
+also records coarse timings of the phases of loading and searching cases:
+discovery, parse, validate, index, first paint and every filter pass. Both are
+written to FILE as text when the command exits.
+
+Phases are timed with phase() and mark(), which do nothing unless a profile is
+being recorded, so they can stay in hot paths.
+"""
+
+import cProfile
+import io
+import math
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+
+# Phases whose runs are listed one by one in the report; the rest are summed up
+LISTED_PHASES = ("first paint", "filter")
+# Functions shown in the cProfile section of the report
+STATS_LIMIT = 60
+
+_NO_PHASE: AbstractContextManager[None] = nullcontext()
+
+
+class Profile:
+    """cProfile stats and phase timings of one command
+
+    Phases may be timed from any thread. cProfile itself sees every thread on
+    Python 3.12 and later, only the main thread before.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+        # Phase name -> (seconds, detail) of every time it ran
+        self.phases: dict[str, list[tuple[float, str]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, detail: str = "") -> None:
+        with self._lock:
+            self.phases.setdefault(name, []).append((seconds, detail))
+
+    @contextmanager
+    def phase(self, name: str, detail: str = "") -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, detail)
+
+    def report(self) -> str:
+        import pstats
+
+        out = io.StringIO()
+        total = time.perf_counter() - self.started
+        out.write(f"Total: {total * 1000:.1f} ms\n\nPhases:\n")
+        out.write(f"  {'phase':<12} {'count':>8} {'total ms':>10} {'max ms':>10}\n")
+        for name, samples in self.phases.items():
+            seconds = [sample for sample, _ in samples]
+            out.write(
+                f"  {name:<12} {len(seconds):>8} {sum(seconds) * 1000:>10.1f} "
+                f"{max(seconds) * 1000:>10.1f}\n"
+            )
+        for name in LISTED_PHASES:
+            if samples := self.phases.get(name):
+                out.write(f"\n{name.capitalize()}:\n")
+                for seconds, detail in samples:
+                    out.write(f"  {seconds * 1000:>10.1f} ms  {detail}\n")
+        out.write("\ncProfile, by cumulative time:\n")
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(STATS_LIMIT)
+        return out.getvalue()
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """p50, p95, p99 and max of samples, by nearest rank"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def rank(p: float) -> float:
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99), "max": ordered[-1]}
+
+
+_active: Profile | None = None
+
+
+def phase(name: str, detail: str = "") -> AbstractContextManager[None]:
+    """Time the block as a run of the named phase if profiling"""
+    if _active is None:
+        return _NO_PHASE
+    return _active.phase(name, detail)
+
+
+def mark(name: str, detail: str = "") -> None:
+    """Record the time since profiling started as a run of the named phase"""
+    if _active is not None:
+        _active.record(name, time.perf_counter() - _active.started, detail)
+
+
+@contextmanager
+def profile(path: Path) -> Iterator[Profile]:
+    """Profile the block and write the report to path"""
+    global _active
+    current = Profile()
+    _active = current
+    current.profiler.enable()
+    try:
+        yield current
+    finally:
+        current.profiler.disable()
+        _active = None
+        path.write_text(current.report())
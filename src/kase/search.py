@@ -0,0 +1,293 @@
+import bisect
+import heapq
+import importlib.util
+import re
+import threading
+from collections.abc import Collection, Iterable, Sequence
+from functools import cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from . import profiling
+
+# rapidfuzz is imported where it is used: listing cases and looking up case
+# numbers with an up-to-date search index do without it
+if TYPE_CHECKING:
+    from .cases import ListedCase
+
+# Cases must score strictly above this partial_ratio to match a query
+SCORE_CUTOFF = 80.0
+
+
+class SearchKeys(NamedTuple):
+    """Searchable text of a case, already normalized with default_process
+
+    Building these once per case means a filter pass only has to normalize
+    the query string.
+    """
+
+    sf: str
+    lp: str
+    title: str
+    # sf, lp, title and description together, as matched by the fuzzy filter
+    text: str
+
+    @classmethod
+    def build(cls, sf: str, lp: str, title: str, desc: str) -> "SearchKeys":
+        from rapidfuzz.utils import default_process
+
+        return cls(
+            sf=default_process(sf),
+            lp=default_process(lp),
+            title=default_process(title),
+            text=default_process(" ".join([sf, lp, title, desc])),
+        )
+
+
+def process_query(query: str) -> str:
+    """Normalize a query the same way as SearchKeys"""
+    if query.isascii() and query.isdigit():
+        # Already normalized, and case number lookups then don't need rapidfuzz
+        return query
+    from rapidfuzz.utils import default_process
+
+    return default_process(query)
+
+
+@cache
+def _have_numpy() -> bool:
+    # rapidfuzz's cdist needs numpy, which kase does not depend on
+    return importlib.util.find_spec("numpy") is not None
+
+
+def fuzzy_scores(
+    query: str, choices: Sequence[str], workers: int = -1
+) -> list[tuple[int, float]]:
+    """Score normalized choices against a normalized query in a single batch
+
+    Returns (position, score) for every choice scoring above SCORE_CUTOFF, in
+    choice order. The scan runs inside rapidfuzz, on all cores when numpy is
+    available and on one core otherwise.
+    """
+    if not query or not choices:
+        return []
+    from rapidfuzz import process
+    from rapidfuzz.fuzz import partial_ratio
+
+    if _have_numpy():
+        scores = process.cdist(
+            [query],
+            choices,
+            scorer=partial_ratio,
+            score_cutoff=SCORE_CUTOFF,
+            workers=workers,
+        )[0]
+        return [
+            (int(position), float(scores[position]))
+            for position in (scores > SCORE_CUTOFF).nonzero()[0]
+        ]
+    matches = process.extract(
+        query,
+        choices,
+        scorer=partial_ratio,
+        score_cutoff=SCORE_CUTOFF,
+        limit=None,
+    )
+    return sorted(
+        (position, score) for _, score, position in matches if score > SCORE_CUTOFF
+    )
+
+
+def _recency(case: "ListedCase") -> int:
+    # Salesforce case numbers are sequential, so a higher number is newer
+    return int(case.sf) if case.sf.isdigit() else -1
+
+
+def rank(
+    cases: Sequence["ListedCase"], scores: Iterable[tuple[int, float]], limit: int
+) -> list[int]:
+    """Positions of the limit best scores, best first, newest case first on ties"""
+    best = heapq.nlargest(
+        limit, scores, key=lambda item: (item[1], _recency(cases[item[0]]))
+    )
+    return [position for position, _ in best]
+
+
+class NumberIndex:
+    """Sorted index of the SF and LP numbers of cases, for prefix lookups"""
+
+    NUMBER_RE = re.compile(r"\d+")
+
+    def __init__(self, cases: list["ListedCase"]):
+        # Shared with the owner, which appends to it as cases are added
+        self._cases = cases
+        self._entries: list[tuple[str, int]] = []
+        self._indexed = 0
+
+    def invalidate(self) -> None:
+        """Rebuild on next lookup, e.g. after a case was replaced in place"""
+        self._entries = []
+        self._indexed = 0
+
+    def lookup(self, prefix: str) -> list[int]:
+        """Positions of cases with an SF or LP number starting with prefix"""
+        self._update()
+        entries = self._entries
+        hits: set[int] = set()
+        i = bisect.bisect_left(entries, (prefix,))
+        while i < len(entries) and entries[i][0].startswith(prefix):
+            hits.add(entries[i][1])
+            i += 1
+        return sorted(hits)
+
+    def _update(self) -> None:
+        if self._indexed == len(self._cases):
+            return
+        for position in range(self._indexed, len(self._cases)):
+            case = self._cases[position]
+            self._entries.append((case.sf, position))
+            self._entries.extend(
+                (number, position) for number in self.NUMBER_RE.findall(case.lp)
+            )
+        self._entries.sort()
+        self._indexed = len(self._cases)
+
+
+class CaseSearch:
+    """Fuzzy filter engine over a collection of cases keyed by SF number
+
+    Keeps the normalized search text of every case in one list so a query is
+    scored against all of them in a single batched call.
+
+    The matches of the previous query are remembered: when the next query
+    extends it (the user typed more characters) only those survivors, plus
+    any cases added since, are rescored. This treats partial_ratio as if it
+    could only drop matches as a query grows, which is not strictly true but
+    matches what the user expects from a narrowing search. Deleting or editing
+    characters falls back to a full scan.
+
+    Purely numeric queries are first looked up as a prefix of the SF and LP
+    numbers; only if no case number matches are they fuzzy matched.
+
+    The search text includes the description, which listed cases may not
+    have loaded yet, so it is only collected once a query needs it.
+
+    Cases may be added or removed from one thread while another filters.
+    Adding and removing never wait for a filter pass: a pass scores the
+    lists as they were when it started, and replacing or removing cases
+    swaps in new lists instead of changing those in place.
+    """
+
+    def __init__(self, cases: Iterable["ListedCase"] = ()):
+        self.cases: list[ListedCase] = []
+        self._texts: list[str] = []
+        self._positions: dict[str, int] = {}
+        self.numbers = NumberIndex(self.cases)
+        self._last_query: str | None = None
+        self._last_scores: list[tuple[int, float]] = []
+        # The case list _last_scores refers to and how many of its cases
+        # existed when they were computed
+        self._last_cases: list[ListedCase] | None = None
+        self._last_scanned = 0
+        # Guards the lists above; only held to change them or take a snapshot
+        self._lock = threading.Lock()
+        # Serializes filter passes, which extend the texts and the number index
+        self._filter_lock = threading.Lock()
+        self.add(cases)
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def add(self, cases: Iterable["ListedCase"]) -> None:
+        """Add cases, replacing any already present with the same SF number"""
+        with self._lock:
+            self._add(cases)
+
+    def _add(self, cases: Iterable["ListedCase"]) -> None:
+        replaced = False
+        for case in cases:
+            if (position := self._positions.get(case.sf)) is not None:
+                if not replaced:
+                    self.cases = self.cases.copy()
+                    self._texts = self._texts.copy()
+                    replaced = True
+                self.cases[position] = case
+                # Texts from here on are collected again by the next filter
+                del self._texts[position:]
+                continue
+            self._positions[case.sf] = len(self.cases)
+            self.cases.append(case)
+        if replaced:
+            self._reindex()
+
+    def remove(self, sfs: Collection[str]) -> None:
+        """Remove the cases with these SF numbers"""
+        with self._lock:
+            kept = [i for i, case in enumerate(self.cases) if case.sf not in sfs]
+            if len(kept) == len(self.cases):
+                return
+            texts = self._texts
+            self._texts = [texts[i] for i in kept if i < len(texts)]
+            self.cases = [self.cases[i] for i in kept]
+            self._positions = {case.sf: i for i, case in enumerate(self.cases)}
+            self._reindex()
+
+    def _reindex(self) -> None:
+        self.numbers = NumberIndex(self.cases)
+
+    def filter(
+        self, query: str, limit: int | None = None, refine: bool = True
+    ) -> list["ListedCase"]:
+        """Cases matching a raw query
+
+        Without a limit every match is returned in the order the cases were
+        added. With a limit only the best limit matches are kept, ranked by
+        score.
+
+        With refine, a query that extends the previous one only scores the
+        previous matches, as when typing. Without it the query is scored on
+        its own and the previous one is left as it was, for callers that
+        share the engine between unrelated queries.
+        """
+        with self._filter_lock, profiling.phase("filter", query):
+            with self._lock:
+                cases, texts, numbers = self.cases, self._texts, self.numbers
+                # Cases appended from here on are left for the next pass
+                count = len(cases)
+            scores = self._score(
+                process_query(query), cases, count, texts, numbers, refine
+            )
+            if limit is None:
+                return [cases[i] for i, _ in scores]
+            return [cases[i] for i in rank(cases, scores, limit)]
+
+    def _score(
+        self,
+        query: str,
+        cases: list["ListedCase"],
+        count: int,
+        texts: list[str],
+        numbers: NumberIndex,
+        refine: bool,
+    ) -> list[tuple[int, float]]:
+        if query.isdigit() and (hits := numbers.lookup(query)):
+            if refine:
+                # Case number hits aren't fuzzy scores, so don't refine from them
+                self._last_query = None
+            return [(position, 100.0) for position in hits]
+        texts.extend(case.search_keys.text for case in cases[len(texts) : count])
+        last = self._last_query if refine else None
+        if last and query.startswith(last) and self._last_cases is cases:
+            candidates = [position for position, _ in self._last_scores]
+            candidates.extend(range(self._last_scanned, len(texts)))
+            scores = [
+                (candidates[i], score)
+                for i, score in fuzzy_scores(query, [texts[i] for i in candidates])
+            ]
+        else:
+            scores = fuzzy_scores(query, texts)
+        if refine:
+            self._last_query = query
+            self._last_scores = scores
+            self._last_cases = cases
+            self._last_scanned = len(texts)
+        return scores
@@ -1,5 +1,4 @@
 import os
-from collections import OrderedDict
 from pathlib import Path
 from typing import Unpack, cast, final, override
 
@@ -7,14 +6,14 @@ from textual import on
 from textual.app import App
 from textual.widgets import Footer, Header
 
-from kase.cases import Case, CaseRepo
-from kase.importer import SalesforceCSV
+from kase.cases import CaseRepo
+from kase.importer import ExportedCase, SalesforceCSV
 from kase.tui.widgets.case_selector import CaseSelector
 from kase.types import AppOptions
 
 
 @final
-class ImporterApp(App[list[Case]]):
+class ImporterApp(App[list[ExportedCase]]):
     TITLE = "Select cases to import"
     COMMAND_PALETTE_BINDING = "ctrl+shift+p"
 
@@ -35,12 +34,11 @@ class ImporterApp(App[list[Case]]):
 
     @override
     def compose(self):
-        repo = CaseRepo(self._case_dir)
-        existing_case_ids = {case.sf for case in repo.cases}
+        existing_case_ids = CaseRepo(self._case_dir).case_ids
         yield Header()
         yield CaseSelector(
             initial_prompt=self._initial_prompt,
-            cases=OrderedDict({case.sf: case for case in self.salesforce_csv.cases()}),
+            cases=self.salesforce_csv.summaries(),
             enable_multiselect=True,
             exclude_ids=existing_case_ids,
         )
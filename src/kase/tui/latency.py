@@ -0,0 +1,70 @@
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import TextIO
+
+from ..profiling import percentiles
+
+
+class KeystrokeLatency:
+    """Time from a change of the filter text until the matches are painted
+
+    Every keystroke starts a sample tagged with the generation of the update it
+    requests, which stamps when scoring starts and ends, when the table is
+    updated and when that is painted. A keystroke whose update is superseded
+    before it is shown is painted with the later one, so it has no scoring or
+    update stamps of its own.
+
+    Stamps are seconds since the tracker was created. Finished samples are
+    written as JSON lines to trace_file if given.
+    """
+
+    # Number of recent keystrokes the percentiles are taken over
+    WINDOW = 200
+
+    def __init__(self, trace_file: Path | None = None):
+        self.started = time.perf_counter()
+        self.latencies: deque[float] = deque(maxlen=self.WINDOW)
+        self._pending: dict[int, dict[str, float | str | int]] = {}
+        self._trace_file = trace_file
+        self._trace: TextIO | None = None
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.started
+
+    def keystroke(self, generation: int, query: str) -> None:
+        self._pending[generation] = {
+            "generation": generation,
+            "query": query,
+            "input": self._now(),
+        }
+
+    def stamp(self, generation: int, name: str) -> None:
+        if (sample := self._pending.get(generation)) is not None:
+            sample[name] = self._now()
+
+    def painted(self, generation: int) -> None:
+        """Finish the samples of generation and of the keystrokes it superseded"""
+        now = self._now()
+        for pending in [g for g in self._pending if g <= generation]:
+            sample = self._pending.pop(pending)
+            sample["paint"] = now
+            self.latencies.append(now - float(sample["input"]))
+            self._write(sample)
+
+    def percentiles(self) -> dict[str, float]:
+        """p50, p95, p99 and max of the recent latencies, in seconds"""
+        return percentiles(list(self.latencies))
+
+    def _write(self, sample: dict[str, float | str | int]) -> None:
+        if self._trace_file is None:
+            return
+        if self._trace is None:
+            self._trace = self._trace_file.open("a", buffering=1)
+        self._trace.write(json.dumps(sample) + "\n")
+
+    def close(self) -> None:
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
@@ -1,18 +1,21 @@
-from collections import OrderedDict
+import threading
+from pathlib import Path
 from typing import Unpack, cast, final, override
 
 from textual import on
 from textual.app import App
 from textual.widgets import Footer, Header
+from textual.worker import get_current_worker
 
-from kase.cases import Case, CaseRepo
+from kase.cases import ListedCase
+from kase.daemon import open_repo
 from kase.tui.widgets.case_selector import CaseSelector
 
 from ..types import AppOptions
 
 
 @final
-class QueryApp(App[Case]):
+class QueryApp(App[ListedCase]):
     TITLE = "Your cases!"
     COMMAND_PALETTE_BINDING = "ctrl+shift+p"
 
@@ -20,22 +23,49 @@ class QueryApp(App[Case]):
         self,
         case_dir: str,
         initial_prompt: str = "",
+        jobs: int = 1,
+        max_results: int | None = None,
+        latency_trace: Path | None = None,
         **kwargs: Unpack[AppOptions],
     ):
         super().__init__(**kwargs)
 
-        self.repo = CaseRepo(case_dir)
+        self.repo = open_repo(case_dir, jobs=jobs)
         self._initial_prompt = initial_prompt
+        self._max_results = max_results
+        self._latency_trace = latency_trace
+        self._stop_watching = threading.Event()
 
     @override
     def compose(self):
         yield Header()
         yield CaseSelector(
             initial_prompt=self._initial_prompt,
-            cases=OrderedDict({case.sf: case for case in self.repo.cases}),
+            cases=self.repo.cases,
+            max_results=self._max_results,
+            latency_trace=self._latency_trace,
         )
         yield Footer()
 
+    @on(CaseSelector.CasesLoaded)
+    def start_watching(self, event: CaseSelector.CasesLoaded):
+        """Keep the listed cases in sync with the case directory"""
+        selector = event.selector
+        cases = list(selector.cases.values())
+        _ = self.run_worker(
+            lambda: self._watch(selector, cases), group="watch", thread=True
+        )
+
+    def _watch(self, selector: CaseSelector, cases: list[ListedCase]) -> None:
+        worker = get_current_worker()
+        for changes in self.repo.watch(cases, self._stop_watching):
+            if worker.is_cancelled:
+                return
+            self.call_from_thread(selector.apply_changes, changes)
+
+    def on_unmount(self):
+        self._stop_watching.set()
+
     @on(CaseSelector.CaseSelected)
     def action_select_row(self, event: CaseSelector.CaseSelected):
         cast(QueryApp, self.app).exit(event.case, return_code=0)
@@ -0,0 +1,233 @@
+from collections.abc import Callable, Iterable
+from typing import override
+
+from rich.segment import Segment
+from rich.style import Style
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from ...cases import ListedCase
+
+MARKED_STYLE = Style.parse("bold green")
+
+
+class CaseList(ScrollView, can_focus=True):
+    """A two column (SF ID, Title) list of cases that only renders what is in view
+
+    The list keeps nothing but the cases it shows. Each line is built from its
+    case when it is painted, so the cost of a repaint depends on the height of
+    the widget rather than the number of cases listed.
+    """
+
+    class Highlighted(Message):
+        """Posted when the case under the cursor changes"""
+
+        def __init__(self, case_list: "CaseList", case: ListedCase | None):
+            super().__init__()
+            self.case_list = case_list
+            self.case = case
+
+        @property
+        def control(self) -> "CaseList":
+            return self.case_list
+
+    BINDINGS = [
+        Binding("up", "cursor_up", "Cursor up", show=False),
+        Binding("down", "cursor_down", "Cursor down", show=False),
+    ]
+
+    COMPONENT_CLASSES = {
+        "case-list--header",
+        "case-list--even-row",
+        "case-list--cursor",
+    }
+
+    DEFAULT_CSS = """
+    CaseList {
+        background: $surface;
+        color: $foreground;
+        overflow-x: hidden;
+
+        &:focus {
+            background-tint: $foreground 5%;
+            & > .case-list--cursor {
+                background: $block-cursor-background;
+                color: $block-cursor-foreground;
+                text-style: $block-cursor-text-style;
+            }
+        }
+
+        &:dark > .case-list--even-row {
+            background: $surface-darken-1 40%;
+        }
+
+        & > .case-list--header {
+            text-style: bold;
+            background: $panel;
+            color: $foreground;
+        }
+
+        & > .case-list--even-row {
+            background: $surface-lighten-1 50%;
+        }
+
+        & > .case-list--cursor {
+            background: $block-cursor-blurred-background;
+            color: $block-cursor-blurred-foreground;
+            text-style: $block-cursor-blurred-text-style;
+        }
+    }
+    """
+
+    HEADER = ("SF ID", "Title")
+    # Blank cells either side of a column
+    CELL_PADDING = 1
+
+    def __init__(
+        self,
+        is_marked: Callable[[str], bool] | None = None,
+        *,
+        name: str | None = None,
+        id: str | None = None,
+        classes: str | None = None,
+    ):
+        """is_marked is asked, by SF number, whether a row is drawn as marked"""
+        super().__init__(name=name, id=id, classes=classes)
+        self.cases: list[ListedCase] = []
+        self._is_marked = is_marked or (lambda _sf: False)
+        self._cursor_row = 0
+        self._sf_width = len(self.HEADER[0])
+        self._highlighted: ListedCase | None = None
+
+    @property
+    def row_count(self) -> int:
+        return len(self.cases)
+
+    @property
+    def cursor_row(self) -> int:
+        return self._cursor_row
+
+    @property
+    def highlighted_case(self) -> ListedCase | None:
+        return self.case_at(self._cursor_row)
+
+    def case_at(self, row: int) -> ListedCase | None:
+        if 0 <= row < len(self.cases):
+            return self.cases[row]
+        return None
+
+    def set_cases(
+        self, cases: list[ListedCase], selected: ListedCase | None = None
+    ) -> None:
+        """Show cases, in order, with the cursor on selected if it is listed"""
+        self.cases = cases
+        self._sf_width = _column_width(cases, len(self.HEADER[0]))
+        row = 0
+        if selected is not None:
+            row = next(
+                (pos for pos, case in enumerate(cases) if case.sf == selected.sf), 0
+            )
+        self._resize()
+        self.move_cursor(row=row)
+
+    def append(self, cases: Iterable[ListedCase]) -> None:
+        start = len(self.cases)
+        self.cases.extend(cases)
+        if len(self.cases) == start:
+            return
+        self._sf_width = _column_width(self.cases[start:], self._sf_width)
+        self._resize()
+        self._check_highlighted()
+
+    def move_cursor(self, *, row: int) -> None:
+        self._cursor_row = max(0, min(row, len(self.cases) - 1))
+        self._scroll_to_cursor()
+        self.refresh()
+        self._check_highlighted()
+
+    def _resize(self) -> None:
+        # One extra line for the header
+        self.virtual_size = Size(0, len(self.cases) + 1)
+        self.refresh()
+
+    @property
+    def _page_height(self) -> int:
+        return max(1, self.scrollable_content_region.height - 1)
+
+    def _scroll_to_cursor(self) -> None:
+        top = round(self.scroll_y)
+        if self._cursor_row < top:
+            self.scroll_to(y=self._cursor_row, animate=False)
+        elif self._cursor_row >= top + self._page_height:
+            self.scroll_to(y=self._cursor_row - self._page_height + 1, animate=False)
+
+    def _check_highlighted(self) -> None:
+        case = self.highlighted_case
+        if case is not self._highlighted:
+            self._highlighted = case
+            self.post_message(self.Highlighted(self, case))
+
+    @override
+    def render_line(self, y: int) -> Strip:
+        width = self.scrollable_content_region.width
+        if y == 0:
+            style = self.get_component_rich_style("case-list--header")
+            return self._render_row(*self.HEADER, style, style, width)
+        row = round(self.scroll_y) + y - 1
+        case = self.case_at(row)
+        if case is None:
+            return Strip.blank(width, self.rich_style)
+        style = self.rich_style
+        if row % 2 == 0:
+            style += self.get_component_rich_style("case-list--even-row")
+        if row == self._cursor_row:
+            style += self.get_component_rich_style("case-list--cursor")
+        text_style = style + MARKED_STYLE if self._is_marked(case.sf) else style
+        return self._render_row(case.sf, case.title, style, text_style, width)
+
+    def _render_row(
+        self, sf: str, title: str, style: Style, text_style: Style, width: int
+    ) -> Strip:
+        pad = " " * self.CELL_PADDING
+        segments = [
+            Segment(pad, style),
+            Segment(sf.ljust(self._sf_width), text_style),
+            Segment(pad * 2, style),
+            Segment(title, text_style),
+        ]
+        return Strip(segments).crop_extend(0, width, style)
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(row=self._cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(row=self._cursor_row + 1)
+
+    @override
+    def action_page_up(self) -> None:
+        self.move_cursor(row=self._cursor_row - self._page_height)
+
+    @override
+    def action_page_down(self) -> None:
+        self.move_cursor(row=self._cursor_row + self._page_height)
+
+    @override
+    def action_scroll_home(self) -> None:
+        self.move_cursor(row=0)
+
+    @override
+    def action_scroll_end(self) -> None:
+        self.move_cursor(row=len(self.cases) - 1)
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is not None and offset.y > 0:
+            self.move_cursor(row=round(self.scroll_y) + offset.y - 1)
+
+
+def _column_width(cases: list[ListedCase], minimum: int) -> int:
+    return max(minimum, max((len(case.sf) for case in cases), default=0))
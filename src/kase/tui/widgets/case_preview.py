@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+
+from textual.timer import Timer
+from textual.widgets import ContentSwitcher, Markdown
+
+from ...cases import ListedCase
+
+PreviewKey = tuple[str, int | None]
+
+
+class CasePreview(ContentSwitcher):
+    """Markdown preview of a single case
+
+    Each preview is rendered into its own Markdown widget, and the most
+    recently shown ones are kept so that returning to a case only switches
+    which widget is displayed. Previews requested in quick succession, as when
+    holding down a cursor key, are coalesced so that only the case the cursor
+    stops on is rendered.
+    """
+
+    # Rendered previews kept, least recently shown first
+    CACHE_SIZE = 32
+    # A preview requested less than this long (seconds) after the previous one
+    # is rendered once no newer request arrives within this time
+    DELAY = 0.05
+
+    EMPTY_ID = "no-case"
+
+    def __init__(self, *, classes: str | None = None):
+        super().__init__(Markdown(id=self.EMPTY_ID), classes=classes)
+        self._rendered: OrderedDict[PreviewKey, Markdown] = OrderedDict()
+        self._wanted: PreviewKey | None = None
+        self._timer: Timer | None = None
+        self._last_request = 0.0
+        self._next_id = 0
+
+    async def show(self, case: ListedCase | None) -> None:
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        now = time.monotonic()
+        recent = now - self._last_request < self.DELAY
+        self._last_request = now
+
+        if case is None:
+            self._wanted = None
+            await self.query_one(f"#{self.EMPTY_ID}", Markdown).update(
+                "No case selected"
+            )
+            self.current = self.EMPTY_ID
+            return
+
+        key = _preview_key(case)
+        self._wanted = key
+        if (markdown := self._rendered.get(key)) is not None:
+            self._rendered.move_to_end(key)
+            self.current = markdown.id
+        elif recent:
+            self._timer = self.set_timer(self.DELAY, lambda: self._render_preview(case))
+        else:
+            await self._render_preview(case)
+
+    async def _render_preview(self, case: ListedCase) -> None:
+        self._timer = None
+        key = _preview_key(case)
+        if key not in self._rendered:
+            self._next_id += 1
+            markdown = Markdown(_preview_text(case), id=f"preview-{self._next_id}")
+            self._rendered[key] = markdown
+            await self.add_content(markdown)
+        # The cursor may have moved on while the preview was being mounted
+        if key == self._wanted:
+            self._rendered.move_to_end(key)
+            self.current = self._rendered[key].id
+        while len(self._rendered) > self.CACHE_SIZE:
+            _, evicted = self._rendered.popitem(last=False)
+            await evicted.remove()
+
+
+def _preview_text(case: ListedCase) -> str:
+    try:
+        return case.preview
+    except (OSError, ValueError, TypeError) as e:
+        # The case was changed or removed since it was listed
+        return f"# [{case.sf}] {case.title}\n\n*Could not load the case: {e}*"
+
+
+def _preview_key(case: ListedCase) -> PreviewKey:
+    return case.sf, case.mtime_ns
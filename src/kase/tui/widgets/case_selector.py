@@ -1,36 +1,55 @@
-import asyncio
+import time
 from collections import OrderedDict
+from collections.abc import AsyncIterable, Iterable, Iterator
+from functools import partial
+from itertools import islice
+from pathlib import Path
 from typing import override
 
-from rapidfuzz import utils
-from rapidfuzz.fuzz import partial_ratio
-from rich.text import Text
 from textual.binding import Binding
 from textual.containers import Horizontal
 from textual.message import Message
 from textual.widget import Widget
-from textual.widgets import DataTable, Input, Markdown
+from textual.widgets import Input, Label
+from textual.worker import get_current_worker
 
-from ...cases import Case
+from ... import profiling
+from ...cases import CaseChange, ChangeKind, ListedCase
+from ...search import CaseSearch
+from ..latency import KeystrokeLatency
+from .case_list import CaseList
+from .case_preview import CasePreview
 
 
 class CaseSelector(Widget):
     class CaseSelected(Message):
-        def __init__(self, case: Case):
+        def __init__(self, case: ListedCase):
             super().__init__()
             self.case = case
 
     class CasesSubmitted(Message):
-        def __init__(self, cases: list[Case]):
+        def __init__(self, cases: list[ListedCase]):
             super().__init__()
             self.cases = cases
 
+    class CasesLoaded(Message):
+        """Every case of the source has been added"""
+
+        def __init__(self, selector: "CaseSelector"):
+            super().__init__()
+            self.selector = selector
+
+        @property
+        def control(self) -> "CaseSelector":
+            return self.selector
+
     BINDINGS = [
         Binding("ctrl+n", "cursor_down", "Move cursor down", priority=True),
         Binding("ctrl+p", "cursor_up", "Move cursor up", priority=True),
         Binding("enter", "select_row", "Submit", priority=True),
         Binding("ctrl+m", "toggle_mark", "Mark/unmark case", priority=True),
         Binding("ctrl+e", "toggle_exclude", "Toggle excluded cases", priority=True),
+        Binding("f12", "toggle_latency", "Toggle latency HUD", show=False),
     ]
 
     DEFAULT_CSS = """
@@ -43,93 +62,335 @@ class CaseSelector(Widget):
         width: 1fr;
         height: 100%;
     }
+
+    .load-status {
+        display: none;
+        color: $text-muted;
+    }
+
+    .load-status.-loading {
+        display: block;
+    }
+
+    .latency-hud {
+        display: none;
+        color: $text-muted;
+    }
+
+    .latency-hud.-visible {
+        display: block;
+    }
     """
 
+    # Cases shown as soon as they have loaded; enough to fill a screen
+    FIRST_BATCH_SIZE = 50
+    # Streamed cases are handed to the UI in batches of at most this size...
+    BATCH_SIZE = 500
+    # ...or at least this often (seconds), whichever comes first
+    BATCH_INTERVAL = 0.05
+    # The delay between a keystroke and filtering follows the measured cost of
+    # a filter pass, so cheap filters run immediately and expensive ones wait
+    # for typing to pause, but never longer than this (seconds)
+    MAX_DEBOUNCE = 0.1
+
     def __init__(
         self,
-        cases: OrderedDict[str, Case],
+        cases: OrderedDict[str, ListedCase]
+        | Iterable[ListedCase]
+        | AsyncIterable[ListedCase],
         initial_prompt: str = "",
         enable_multiselect: bool = False,
         exclude_ids: set[str] | None = None,
+        max_results: int | None = None,
+        latency_trace: Path | None = None,
     ):
+        """
+        cases may be a mapping of SF number to case, or an (async) iterable of
+        cases which is consumed in the background, adding rows as they load.
+
+        If max_results is set, a filter shows only that many of the best
+        matching cases, ranked by score, instead of every match in repo order.
+
+        The latency from each keystroke until its matches are painted is
+        measured once the latency HUD is first shown, or from the start if
+        latency_trace is set, in which case every sample is appended to it as
+        a JSON line.
+        """
         super().__init__()
 
-        self.cases = cases
+        self.cases: OrderedDict[str, ListedCase] = OrderedDict()
+        self._source: Iterable[ListedCase] | AsyncIterable[ListedCase] | None = None
+        if isinstance(cases, dict):
+            self.cases = cases
+        else:
+            self._source = cases
+        self.search = CaseSearch(self.cases.values())
+        self.loading_cases = False
         self.filter_text = initial_prompt
-        self.update_task = None
+        # Whether an update is on its way, and whether the cases changed since
+        # it started, so it must be followed by another
+        self._update_pending = False
+        self._stale = False
+        # Bumped for every requested update so stale results can be dropped
+        self._generation = 0
+        # Moving average of the time a filter pass takes, in seconds
+        self._filter_cost = 0.0
         self.multiselect_enabled = enable_multiselect
         self.marked_case_ids: set[str] = set()
         self.exclude_ids: set[str] = exclude_ids or set()
         self.hide_excluded: bool = True
+        self.max_results = max_results
+        self.latency: KeystrokeLatency | None = None
+        if latency_trace is not None:
+            self.latency = KeystrokeLatency(latency_trace)
+        self.show_latency = False
 
     @override
     def compose(self):
         with Horizontal():
-            yield DataTable[str](
-                cursor_type="row", zebra_stripes=True, classes="caselist"
-            )
-            yield Markdown(classes="preview")
+            yield CaseList(self._is_marked, classes="caselist")
+            yield CasePreview(classes="preview")
+        yield Label(classes="load-status")
+        yield Label(classes="latency-hud")
         yield Input(
             self.filter_text, placeholder="Filter", compact=True, select_on_focus=False
         )
 
     def on_mount(self):
-        caselist = self.query_one(DataTable)
-        caselist.add_column("SF ID", key="SF ID")
-        caselist.add_column("Title", key="Title")
         self._reset_table()
+        if self._source is not None:
+            self._start_loading(self._source)
+            self._source = None
+        else:
+            self.post_message(self.CasesLoaded(self))
         _ = self.query_one(Input).focus()
+        self.call_after_refresh(profiling.mark, "first paint")
+
+    def on_unmount(self):
+        if self.latency is not None:
+            self.latency.close()
+
+    def _start_loading(
+        self, source: Iterable[ListedCase] | AsyncIterable[ListedCase]
+    ) -> None:
+        self._set_loading(True)
+        if isinstance(source, AsyncIterable):
+            _ = self.run_worker(self._stream_async(source), group="load")
+            return
+        # Even the first case may take a while to arrive, as listing the repo
+        # can mean a glob and an index load or a daemon round trip, so all of
+        # the cases are read on a thread and never hold up the first paint
+        _ = self.run_worker(
+            lambda: self._stream_sync(iter(source)), group="load", thread=True
+        )
 
-    async def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
-        case_key = event.row_key.value
-        preview = self.query_one(Markdown)
-        if case_key is None:
-            await preview.update("No case selected")
+    def _stream_sync(self, cases: Iterator[ListedCase]) -> None:
+        worker = get_current_worker()
+        # One screenful is shown as soon as it has loaded, then the rest
+        # follows in larger batches
+        first_batch = list(islice(cases, self.FIRST_BATCH_SIZE))
+        if worker.is_cancelled:
+            return
+        self.app.call_from_thread(self._add_cases, first_batch)
+        for batch in _batched(cases, self.BATCH_SIZE, self.BATCH_INTERVAL):
+            if worker.is_cancelled:
+                return
+            self.app.call_from_thread(self._add_cases, batch)
+        self.app.call_from_thread(self._finish_loading)
+
+    async def _stream_async(self, cases: AsyncIterable[ListedCase]) -> None:
+        batch: list[ListedCase] = []
+        deadline = time.monotonic() + self.BATCH_INTERVAL
+        async for case in cases:
+            batch.append(case)
+            if len(batch) >= self.BATCH_SIZE or time.monotonic() >= deadline:
+                self._add_cases(batch)
+                batch = []
+                deadline = time.monotonic() + self.BATCH_INTERVAL
+        self._add_cases(batch)
+        self._finish_loading()
+
+    def _finish_loading(self) -> None:
+        self._set_loading(False)
+        self.post_message(self.CasesLoaded(self))
+
+    def _add_cases(self, cases: list[ListedCase]) -> None:
+        """Add newly loaded cases, showing those that match the current filter"""
+        new_cases: list[ListedCase] = []
+        for case in cases:
+            if case.sf not in self.cases:
+                new_cases.append(case)
+            self.cases[case.sf] = case
+        self.search.add(cases)
+        if self.filter_text:
+            # Filter everything again through the search engine, off the event
+            # loop, so new cases match (and rank) exactly as on a keystroke
+            self._schedule_update(restart=False)
+        elif len(new_cases) < len(cases):
+            # Listed cases were replaced, e.g. by a later row of an export with
+            # the same case number, so their rows must show the new version
+            self.query_one(CaseList).set_cases(
+                self._unfiltered_cases(), self.selected_case()
+            )
         else:
-            case = self.cases[case_key]
-            await preview.update(case.preview)
+            self.query_one(CaseList).append(
+                case for case in new_cases if not self._is_excluded(case.sf)
+            )
+        if self.loading_cases:
+            self._update_load_status()
+
+    def apply_changes(self, changes: Iterable[CaseChange]) -> None:
+        """Bring the cases up to date with changes to the files they came from"""
+        changes = list(changes)
+        updated = [change.case for change in changes if change.case is not None]
+        removed_paths = {
+            change.path for change in changes if change.kind is ChangeKind.removed
+        }
+        removed = {sf for sf, case in self.cases.items() if case.path in removed_paths}
+        # A case whose number was edited goes away under its old number
+        removed.update(
+            sf
+            for sf, case in self.cases.items()
+            for new in updated
+            if case.path == new.path and sf != new.sf
+        )
+        for sf in removed:
+            del self.cases[sf]
+            self.marked_case_ids.discard(sf)
+        self.search.remove(removed)
+
+        caselist = self.query_one(CaseList)
+        selected = self.selected_case()
+        self._add_cases(updated)
+        if self.filter_text:
+            # Edits may change which cases match, so filter again
+            self._schedule_update()
+            return
+        # Show the new version of each visible case and drop removed ones
+        caselist.set_cases(
+            [self.cases[case.sf] for case in caselist.cases if case.sf in self.cases],
+            selected,
+        )
+
+    def _set_loading(self, loading: bool) -> None:
+        self.loading_cases = loading
+        status = self.query_one(".load-status", Label)
+        status.set_class(loading, "-loading")
+        if loading:
+            self._update_load_status()
+
+    def _update_load_status(self) -> None:
+        status = self.query_one(".load-status", Label)
+        status.update(f"Loading cases… {len(self.cases)} loaded")
+
+    async def on_case_list_highlighted(self, event: CaseList.Highlighted):
+        await self.query_one(CasePreview).show(event.case)
 
     async def on_input_changed(self, event: Input.Changed):
         self.filter_text = event.value
-        if self.update_task is None or self.update_task.done():
-            self.update_task = asyncio.create_task(self._update_case_list())
+        if self.latency is not None:
+            # Start the sample before the update it requests can stamp it
+            self.latency.keystroke(self._generation + 1, event.value)
+        self._schedule_update()
+
+    def _schedule_update(self, restart: bool = True) -> None:
+        """Refresh the table for the current filter text
+
+        With restart, any pending update is cancelled so the latest input
+        always wins. Otherwise an update that is already pending is shown
+        first and then followed by another, as it may have missed the change.
+        """
+        if not restart and self._update_pending:
+            self._stale = True
+            return
+        self._update_pending = True
+        self._stale = False
+        self._generation += 1
+        _ = self.run_worker(
+            partial(self._filter_in_thread, self._generation, self.filter_text),
+            group="filter",
+            exclusive=restart,
+            thread=True,
+        )
 
-    async def _update_case_list(self):
-        await asyncio.sleep(0.1)
-        selected = self.selected_case()
-        _ = self.query_one(DataTable).clear()
+    @property
+    def debounce(self) -> float:
+        return min(self._filter_cost, self.MAX_DEBOUNCE)
 
-        if self.filter_text is None or self.filter_text == "":
-            return self._reset_table()
+    def _filter_in_thread(self, generation: int, filter_text: str) -> None:
+        """Score cases off the event loop, handing only the result to the UI"""
+        worker = get_current_worker()
+        time.sleep(self.debounce)
+        if worker.is_cancelled or generation != self._generation:
+            return
+        latency = self.latency
+        if latency is not None:
+            latency.stamp(generation, "score_start")
+        started = time.perf_counter()
+        matches = self._filtered_cases(filter_text) if filter_text else None
+        cost = time.perf_counter() - started
+        if latency is not None:
+            latency.stamp(generation, "score_end")
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._show_filtered, generation, matches, cost)
+
+    def _show_filtered(
+        self, generation: int, matches: list[ListedCase] | None, cost: float
+    ) -> None:
+        if generation != self._generation:
+            return
+        self._update_pending = False
+        started = time.perf_counter()
+        self.query_one(CaseList).set_cases(
+            self._unfiltered_cases() if matches is None else matches,
+            self.selected_case(),
+        )
+        if self.latency is not None:
+            self.latency.stamp(generation, "update")
+            self.call_after_refresh(self._painted, generation)
 
-        return self._apply_filter(self.filter_text, selected)
+        cost += time.perf_counter() - started
+        self._filter_cost = (
+            cost if not self._filter_cost else 0.7 * self._filter_cost + 0.3 * cost
+        )
+        if self._stale:
+            self._schedule_update(restart=False)
 
-    def _reset_table(self):
-        caselist = self.query_one(DataTable)
-        for case in self.cases.values():
-            if self._is_excluded(case.sf):
-                continue
-            _add_row(caselist, case, self._is_marked(case.sf))
-
-    def _apply_filter(self, filter_text: str, selected: Case | None):
-        caselist = self.query_one(DataTable)
-        for case in self.cases.values():
-            if self._is_excluded(case.sf):
-                continue
-            score = (
-                partial_ratio(
-                    " ".join([case.sf, case.lp, case.title, case.desc]),
-                    filter_text,
-                    processor=utils.default_process,
-                )
-                / 100.0
+    def _painted(self, generation: int) -> None:
+        if self.latency is None:
+            return
+        self.latency.painted(generation)
+        if self.show_latency:
+            self._update_latency_hud()
+
+    def _update_latency_hud(self) -> None:
+        hud = self.query_one(".latency-hud", Label)
+        if self.latency is None or not (stats := self.latency.percentiles()):
+            hud.update("Keystroke to paint: type to measure")
+            return
+        hud.update(
+            f"Keystroke to paint, last {len(self.latency.latencies)}: "
+            + "  ".join(
+                f"{name} {stats[name] * 1000:.1f}ms" for name in ("p50", "p95", "p99")
             )
-            if score > 0.8:
-                _add_row(caselist, case, self._is_marked(case.sf))
-                if selected is not None and case == selected:
-                    caselist.move_cursor(row=caselist.get_row_index(selected.sf))
-        if selected is None:
-            caselist.move_cursor(row=0)
+        )
+
+    def _reset_table(self):
+        self.query_one(CaseList).set_cases(self._unfiltered_cases())
+
+    def _unfiltered_cases(self) -> list[ListedCase]:
+        return [case for case in self.cases.values() if not self._is_excluded(case.sf)]
+
+    def _filtered_cases(self, filter_text: str) -> list[ListedCase]:
+        limit = self.max_results
+        if limit is None:
+            matches = self.search.filter(filter_text)
+        else:
+            # Over-fetch so hidden excluded cases don't use up result slots
+            hidden = len(self.exclude_ids) if self.hide_excluded else 0
+            matches = self.search.filter(filter_text, limit=limit + hidden)
+        visible = [case for case in matches if not self._is_excluded(case.sf)]
+        return visible if limit is None else visible[:limit]
 
     def _is_excluded(self, case_key: str) -> bool:
         return self.hide_excluded and str(case_key) in self.exclude_ids
@@ -137,31 +398,14 @@ class CaseSelector(Widget):
     def _is_marked(self, case_key: str) -> bool:
         return self.multiselect_enabled and str(case_key) in self.marked_case_ids
 
-    def _update_row_style(self, case_key: str) -> None:
-        caselist = self.query_one(DataTable)
-        case = self.cases[case_key]
-        marked = self._is_marked(case_key)
-        caselist.update_cell(case_key, "SF ID", _styled_text(case.sf, marked))
-        caselist.update_cell(case_key, "Title", _styled_text(case.title, marked))
-
-    def selected_case(self) -> Case | None:
-        caselist = self.query_one(DataTable)
-        if caselist.row_count == 0:
-            return None
-        # Typechecker doesn't know that Reactive[T] casts to T
-        # noinspection PyTypeChecker
-        if (
-            case_key := caselist.coordinate_to_cell_key(
-                caselist.cursor_coordinate
-            ).row_key.value
-        ) is not None:
-            return self.cases.get(case_key)
+    def selected_case(self) -> ListedCase | None:
+        return self.query_one(CaseList).highlighted_case
 
     def action_cursor_up(self):
-        self.query_one(DataTable).action_cursor_up()
+        self.query_one(CaseList).action_cursor_up()
 
     def action_cursor_down(self):
-        self.query_one(DataTable).action_cursor_down()
+        self.query_one(CaseList).action_cursor_down()
 
     def action_select_row(self):
         if not self.multiselect_enabled:
@@ -194,39 +438,28 @@ class CaseSelector(Widget):
         else:
             self.marked_case_ids.add(case_key)
 
-        self._update_row_style(case_key)
+        self.query_one(CaseList).refresh()
 
     def action_toggle_exclude(self):
         if not self.exclude_ids:
             return
 
-        # Preserve currently selected case (if any) so we can restore the cursor
-        selected = self.selected_case()
-        selected_key = str(selected.sf) if selected is not None else None
-
         self.hide_excluded = not self.hide_excluded
-        table = self.query_one(DataTable)
-        _ = table.clear()
         if self.filter_text:
-            self._apply_filter(self.filter_text, None)
-        else:
-            self._reset_table()
-
-        # Restore cursor to the previously selected case if it is still visible
-        if selected_key is not None and table.row_count:
-            try:
-                row_index = table.get_row_index(selected_key)
-            except KeyError:
-                # The previously selected case is no longer present (e.g. excluded/filtered out)
-                return
+            # The matches are filtered again off the event loop
+            self._schedule_update()
+            return
+        # Preserve currently selected case (if any) so we can restore the cursor
+        selected = self.selected_case()
+        self.query_one(CaseList).set_cases(self._unfiltered_cases(), selected)
 
-            # Keep the current column if possible, otherwise default to the first column
-            column_index = (
-                table.cursor_coordinate.column
-                if len(table.columns) > 0 and table.cursor_coordinate is not None
-                else 0
-            )
-            table.move_cursor(row=row_index, column=column_index)
+    def action_toggle_latency(self):
+        if self.latency is None:
+            self.latency = KeystrokeLatency()
+        self.show_latency = not self.show_latency
+        self.query_one(".latency-hud", Label).set_class(self.show_latency, "-visible")
+        if self.show_latency:
+            self._update_latency_hud()
 
     def check_action(self, action: str, parameters: object) -> bool | None:
         if action == "toggle_mark":
@@ -236,14 +469,17 @@ class CaseSelector(Widget):
         return True
 
 
-def _styled_text(content: str, marked: bool) -> Text:
-    style = "bold green" if marked else ""
-    return Text(content, style=style)
-
-
-def _add_row(table: DataTable, case: Case, marked: bool) -> None:
-    _ = table.add_row(
-        _styled_text(case.sf, marked),
-        _styled_text(case.title, marked),
-        key=str(case.sf),
-    )
+def _batched(
+    cases: Iterator[ListedCase], size: int, interval: float
+) -> Iterator[list[ListedCase]]:
+    """Group cases into batches of up to size, flushing at least every interval"""
+    batch: list[ListedCase] = []
+    deadline = time.monotonic() + interval
+    for case in cases:
+        batch.append(case)
+        if len(batch) >= size or time.monotonic() >= deadline:
+            yield batch
+            batch = []
+            deadline = time.monotonic() + interval
+    if batch:
+        yield batch
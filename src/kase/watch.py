@@ -0,0 +1,227 @@
+"""Notification of changes to the cases of a case directory
+
+A watcher's changes() yields whenever cases may have changed: either the names
+of the case folders to check again, or None if every folder should be checked.
+Inotify is used on Linux. Elsewhere, on network filesystems, whose changes
+made on other machines inotify never hears of, or when the kernel's limit on
+watches is reached, the directory is polled instead.
+"""
+
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Iterator
+
+# Seconds between checks of the stop event while waiting for inotify events
+STOP_CHECK_INTERVAL = 0.5
+# Seconds to wait for more events after the first, so bursts are checked once
+SETTLE_DELAY = 0.05
+# Polls wait at least this many times as long as the last check took, so that
+# a slow case directory is not checked more than a tenth of the time
+POLL_COST_FACTOR = 10
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Case folders appearing in or leaving the case directory
+DIR_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+# case.json being written, replaced or removed within a case folder
+FOLDER_MASK = IN_CLOSE_WRITE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+EVENT = struct.Struct("iIII")
+
+# statfs() f_type of filesystems that may be changed by other machines
+NETWORK_FS_TYPES = {
+    0x6969: "nfs",
+    0x517B: "smb",
+    0xFF534D42: "cifs",
+    0xFE534D42: "smb2",
+    0x73757245: "coda",
+    0x5346414F: "afs",
+    0x00C36400: "ceph",
+    0x01021997: "9p",
+    0x0BD00BD0: "lustre",
+    0x65735546: "fuse",
+}
+# Large enough for struct statfs on every Linux architecture
+STATFS_SIZE = 256
+
+
+class Poller:
+    """Asks for every case folder to be checked every interval seconds
+
+    Checking means listing and stating every case.json, which can take
+    seconds on a network filesystem, so the wait is stretched to
+    POLL_COST_FACTOR times as long as the last check took.
+    """
+
+    def __init__(self, case_dir: str, interval: float):
+        self.case_dir = case_dir
+        self.interval = interval
+
+    def changes(self, stop: threading.Event) -> Iterator[set[str] | None]:
+        wait = self.interval
+        while not stop.wait(wait):
+            started = time.monotonic()
+            # The caller checks the case folders before asking for more
+            yield None
+            wait = max(self.interval, POLL_COST_FACTOR * (time.monotonic() - started))
+
+
+class Inotify:
+    """Reports the case folders the kernel says were touched
+
+    Watches the case directory for folders being added or removed and every
+    case folder for its case.json being written. Raises OSError if inotify
+    is unavailable or the watches can't all be added. If a new case folder
+    can't be watched later on, it falls back to polling every interval
+    seconds.
+    """
+
+    def __init__(self, case_dir: str, interval: float):
+        self.case_dir = case_dir
+        self.interval = interval
+        self._libc = _load_libc()
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise _errno_error()
+        self._fd = fd
+        # Watch descriptor -> case folder name, "" for the case directory
+        self._folders: dict[int, str] = {}
+        try:
+            self._add_watch("", DIR_MASK)
+            with os.scandir(case_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and not entry.name.startswith("."):
+                        self._add_watch(entry.name, FOLDER_MASK)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, name: str, mask: int) -> None:
+        path = os.path.join(self.case_dir, name) if name else self.case_dir
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = _errno_error()
+            if name and error.errno == errno.ENOENT:
+                # The folder went away again before it could be watched
+                return
+            raise error
+        self._folders[wd] = name
+
+    def changes(self, stop: threading.Event) -> Iterator[set[str] | None]:
+        try:
+            while not stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], STOP_CHECK_INTERVAL)
+                if not ready:
+                    continue
+                time.sleep(SETTLE_DELAY)
+                try:
+                    names = self._read()
+                except OSError:
+                    self.close()
+                    yield None
+                    yield from Poller(self.case_dir, self.interval).changes(stop)
+                    return
+                if names is None or names:
+                    yield names
+        finally:
+            self.close()
+
+    def _read(self) -> set[str] | None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names: set[str] | None = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, so check everything
+                names = None
+                continue
+            if mask & IN_IGNORED:
+                self._folders.pop(wd, None)
+                continue
+            folder = self._folders.get(wd)
+            if folder == "":
+                if not mask & IN_ISDIR or name.startswith("."):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watch(name, FOLDER_MASK)
+                folder = name
+            elif folder is None or name != "case.json":
+                continue
+            if names is not None:
+                names.add(folder)
+        return names
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_watcher(case_dir: str, interval: float) -> Poller | Inotify:
+    """Inotify if it can watch case_dir, otherwise a Poller"""
+    if sys.platform.startswith("linux") and not _is_network_fs(case_dir):
+        try:
+            return Inotify(case_dir, interval)
+        except OSError:
+            pass
+    return Poller(case_dir, interval)
+
+
+def _is_network_fs(path: str) -> bool:
+    try:
+        return _fs_type(path) in NETWORK_FS_TYPES
+    except OSError:
+        return False
+
+
+def _fs_type(path: str) -> int:
+    """The f_type statfs() reports for the filesystem path is on"""
+    libc = _load_libc()
+    buffer = ctypes.create_string_buffer(STATFS_SIZE)
+    if libc.statfs(os.fsencode(path), buffer) < 0:
+        raise _errno_error()
+    # f_type is the first field, a word wide; the magic numbers fit in 32 bits
+    return ctypes.c_ulong.from_buffer(buffer).value & 0xFFFFFFFF
+
+
+def _load_libc() -> ctypes.CDLL:
+    try:
+        # The C library is already loaded into the interpreter, so look its
+        # functions up there rather than searching for it with ldconfig
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        libc.statfs.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    except (OSError, AttributeError) as e:
+        raise OSError(errno.ENOSYS, "inotify is not available") from e
+    return libc
+
+
+def _errno_error() -> OSError:
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code))
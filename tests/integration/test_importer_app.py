@@ -105,9 +105,9 @@ class TestImporterApp:
         async with app.run_test() as pilot:
             await pilot.pause()
             selector = app.query_one(CaseSelector)
-            datatable = selector.query_one("DataTable")
+            caselist = selector.query_one("CaseList")
 
-            assert datatable.row_count == 1
+            assert caselist.row_count == 1
 
     def test_cases_submitted_event_exits_app(self, mocker, monkeypatch, fs):
         """Ensure the CasesSubmitted message exits the app with selected cases."""
@@ -1,9 +1,12 @@
 """Integration tests for QueryApp TUI."""
 
+import json
+
 import pytest
 from textual.widgets import Footer, Header
 
 from kase.tui.query import QueryApp
+from kase.tui.widgets.case_list import CaseList
 from kase.tui.widgets.case_selector import CaseSelector
 
 
@@ -51,3 +54,26 @@ class TestQueryApp:
 
         assert captured["result"] == mock_case
         assert captured["return_code"] == 0
+
+    async def test_query_app_shows_cases_created_while_open(self, tmp_path):
+        """Cases written while the app is open should appear without a reload."""
+        (tmp_path / "1000").mkdir()
+        (tmp_path / "1000" / "case.json").write_text(
+            json.dumps({"title": "Existing", "desc": "", "sf": "1000", "lp": ""})
+        )
+        app = QueryApp(case_dir=str(tmp_path))
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            caselist = app.query_one(CaseList)
+            assert caselist.row_count == 1
+
+            (tmp_path / "2000").mkdir()
+            (tmp_path / "2000" / "case.json").write_text(
+                json.dumps({"title": "Created", "desc": "", "sf": "2000", "lp": ""})
+            )
+            for _ in range(50):
+                await pilot.pause(0.1)
+                if caselist.row_count == 2:
+                    break
+
+            assert caselist.case_at(1).title == "Created"
@@ -75,9 +75,9 @@ class TestQueryAppProperties:
             await pilot.pause(0.1)
 
             # The app should not crash regardless of filter
-            datatable = app.query_one("DataTable")
+            caselist = app.query_one("CaseList")
             # Row count should be between 0 and 50 (the number of cases in the repo)
-            assert 0 <= datatable.row_count <= 50
+            assert 0 <= caselist.row_count <= 50
 
     @given(
         case_count=st.integers(min_value=1, max_value=5),
@@ -113,8 +113,8 @@ class TestQueryAppProperties:
         async with app.run_test() as pilot:
             await pilot.pause()
 
-            datatable = app.query_one("DataTable")
-            initial_row = datatable.cursor_row
+            caselist = app.query_one("CaseList")
+            initial_row = caselist.cursor_row
 
             # Try navigating down
             await pilot.press("ctrl+n")
@@ -122,7 +122,7 @@ class TestQueryAppProperties:
 
             # Cursor should move or stay at boundary
             if case_count > 1:
-                assert datatable.cursor_row >= initial_row
+                assert caselist.cursor_row >= initial_row
 
             # Should be able to navigate back
-            assert 0 <= datatable.cursor_row < case_count
+            assert 0 <= caselist.cursor_row < case_count
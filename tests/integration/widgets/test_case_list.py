@@ -0,0 +1,133 @@
+"""Integration tests for the CaseList widget."""
+
+from pathlib import Path
+
+from textual import on
+from textual.app import App, ComposeResult
+
+from kase.model import Case
+from kase.tui.widgets.case_list import CaseList
+
+
+class CaseListHarness(App[None]):
+    """Minimal App used to host CaseList for integration testing."""
+
+    def __init__(self, marked: set[str] | None = None):
+        super().__init__()
+        self.marked = marked or set()
+        self.highlighted: list[Case | None] = []
+
+    def compose(self) -> ComposeResult:
+        yield CaseList(lambda sf: sf in self.marked)
+
+    @on(CaseList.Highlighted)
+    def on_highlighted(self, event: CaseList.Highlighted) -> None:
+        self.highlighted.append(event.case)
+
+
+def make_cases(count: int) -> list[Case]:
+    return [
+        Case(
+            path=Path(f"/cases/{1000 + i}"),
+            title=f"Case {i}",
+            desc=f"Description {i}",
+            sf=str(1000 + i),
+        )
+        for i in range(count)
+    ]
+
+
+class TestCaseList:
+    """Integration tests for CaseList."""
+
+    async def test_renders_only_visible_rows(self, mocker):
+        """Painting a long list should only build the rows in view."""
+        app = CaseListHarness()
+        async with app.run_test() as pilot:
+            caselist = app.query_one(CaseList)
+            render_row = mocker.spy(caselist, "_render_row")
+
+            caselist.set_cases(make_cases(100_000))
+            await pilot.pause()
+
+            assert caselist.row_count == 100_000
+            assert 0 < render_row.call_count <= 2 * caselist.size.height
+
+    async def test_cursor_scrolls_into_view(self):
+        """Moving the cursor past the viewport should scroll to it."""
+        cases = make_cases(1000)
+        app = CaseListHarness()
+        async with app.run_test() as pilot:
+            caselist = app.query_one(CaseList)
+            caselist.set_cases(cases)
+            await pilot.pause()
+
+            caselist.move_cursor(row=500)
+            await pilot.pause()
+
+            assert caselist.highlighted_case is cases[500]
+            assert caselist.scroll_y <= 500 < caselist.scroll_y + caselist.size.height
+            assert app.highlighted[-1] is cases[500]
+
+    async def test_cursor_is_clamped(self):
+        """The cursor should stay within the listed rows."""
+        app = CaseListHarness()
+        async with app.run_test() as pilot:
+            caselist = app.query_one(CaseList)
+            caselist.set_cases(make_cases(3))
+            await pilot.pause()
+
+            caselist.action_cursor_up()
+            assert caselist.cursor_row == 0
+            caselist.action_scroll_end()
+            caselist.action_cursor_down()
+            assert caselist.cursor_row == 2
+
+    async def test_set_cases_follows_selected_case(self):
+        """Replacing the list should keep the cursor on the selected case."""
+        cases = make_cases(5)
+        app = CaseListHarness()
+        async with app.run_test() as pilot:
+            caselist = app.query_one(CaseList)
+            caselist.set_cases(cases)
+            caselist.move_cursor(row=1)
+
+            caselist.set_cases(list(reversed(cases)), cases[1])
+            await pilot.pause()
+
+            assert caselist.cursor_row == 3
+            assert caselist.highlighted_case is cases[1]
+
+            caselist.set_cases(cases[2:], cases[1])
+            assert caselist.cursor_row == 0
+
+    async def test_empty_list_highlights_nothing(self):
+        """Emptying the list should report that no case is highlighted."""
+        app = CaseListHarness()
+        async with app.run_test() as pilot:
+            caselist = app.query_one(CaseList)
+            caselist.set_cases(make_cases(2))
+            caselist.set_cases([])
+            await pilot.pause()
+
+            assert caselist.highlighted_case is None
+            assert app.highlighted[-1] is None
+
+    async def test_marked_rows_are_highlighted(self):
+        """Rows reported as marked should be drawn in bold green."""
+        app = CaseListHarness(marked={"1001"})
+        async with app.run_test() as pilot:
+            caselist = app.query_one(CaseList)
+            caselist.set_cases(make_cases(3))
+            await pilot.pause()
+
+            def is_marked(y: int) -> bool:
+                strip = caselist.render_line(y)
+                return any(
+                    seg.style and seg.style.bold and seg.style.color.name == "green"
+                    for seg in strip
+                )
+
+            # Line 0 is the header and row 0 holds the cursor
+            assert is_marked(2)
+            assert not is_marked(3)
@@ -0,0 +1,126 @@
+"""Integration tests for the CasePreview widget."""
+
+from pathlib import Path
+
+from textual.app import App, ComposeResult
+from textual.widgets import Markdown
+
+from kase.cases import CaseDetails, CaseSummary
+from kase.model import Case
+from kase.tui.widgets.case_preview import CasePreview
+
+
+class CasePreviewHarness(App[None]):
+    """Minimal App used to host CasePreview for integration testing."""
+
+    def compose(self) -> ComposeResult:
+        yield CasePreview()
+
+
+def make_case(sf: str, desc: str = "Description") -> Case:
+    case = Case(path=Path(f"/cases/{sf}"), title=f"Case {sf}", desc=desc, sf=sf)
+    case.__dict__["mtime_ns"] = 1
+    return case
+
+
+def shown_markdown(preview: CasePreview) -> str:
+    content = preview.visible_content
+    assert isinstance(content, Markdown)
+    return content.source
+
+
+class TestCasePreview:
+    """Integration tests for CasePreview."""
+
+    async def test_shows_case(self):
+        """Showing a case should render its preview."""
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            await preview.show(make_case("1234", "Kernel panic"))
+            await pilot.pause()
+
+            assert "Kernel panic" in shown_markdown(preview)
+
+    async def test_shows_placeholder_without_case(self):
+        """Showing no case should display a placeholder."""
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            await preview.show(None)
+            await pilot.pause()
+
+            assert shown_markdown(preview) == "No case selected"
+
+    async def test_shows_error_for_unreadable_case(self, tmp_path):
+        """A case removed since it was listed should show why it can't load."""
+        case = CaseSummary(tmp_path / "1234", "Gone", "1234", "", CaseDetails(None))
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            await preview.show(case)
+            await pilot.pause()
+
+            assert "Could not load the case" in shown_markdown(preview)
+
+    async def test_revisiting_case_reuses_render(self):
+        """Returning to a case should switch back to its rendered preview."""
+        first, second = make_case("1"), make_case("2")
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            await preview.show(first)
+            shown = preview.visible_content
+            await pilot.pause(CasePreview.DELAY * 2)
+            await preview.show(second)
+            await pilot.pause(CasePreview.DELAY * 2)
+
+            await preview.show(first)
+
+            assert preview.visible_content is shown
+
+    async def test_changed_case_is_rendered_again(self):
+        """A case with a new mtime should not reuse the stale preview."""
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            await preview.show(make_case("1", "Old"))
+            await pilot.pause(CasePreview.DELAY * 2)
+
+            updated = make_case("1", "New")
+            updated.__dict__["mtime_ns"] = 2
+            await preview.show(updated)
+            await pilot.pause(CasePreview.DELAY * 2)
+
+            assert "New" in shown_markdown(preview)
+
+    async def test_rapid_requests_render_last_case_only(self, mocker):
+        """Cursor moves in quick succession should only render where it stops."""
+        cases = [make_case(str(sf)) for sf in range(1000, 1020)]
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            render = mocker.spy(preview, "_render_preview")
+            for case in cases:
+                await preview.show(case)
+            await pilot.pause(CasePreview.DELAY * 4)
+
+            rendered = [call.args[0] for call in render.call_args_list]
+            assert rendered == [cases[0], cases[-1]]
+            assert "Case 1019" in shown_markdown(preview)
+
+    async def test_cache_is_bounded(self, monkeypatch):
+        """Only CACHE_SIZE rendered previews should be kept."""
+        monkeypatch.setattr(CasePreview, "CACHE_SIZE", 2)
+        monkeypatch.setattr(CasePreview, "DELAY", 0)
+        app = CasePreviewHarness()
+        async with app.run_test() as pilot:
+            preview = app.query_one(CasePreview)
+            for sf in ("1", "2", "3"):
+                await preview.show(make_case(sf))
+            await pilot.pause()
+
+            assert len(preview._rendered) == 2
+            # The placeholder plus the cached previews
+            assert len(preview.children) == 3
+            assert "Case 3" in shown_markdown(preview)
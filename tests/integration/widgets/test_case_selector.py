@@ -1,12 +1,18 @@
 """Integration tests for the CaseSelector widget."""
 
+import json
+import threading
 from collections import OrderedDict
+from collections.abc import AsyncIterable, Iterable
+from pathlib import Path
 
 from textual import on
 from textual.app import App, ComposeResult
-from textual.widgets import DataTable, Input, Markdown
+from textual.widgets import Input, Label, Markdown
 
-from kase.cases import CaseRepo
+from kase.cases import CaseChange, CaseRepo, ChangeKind
+from kase.model import Case
+from kase.tui.widgets.case_list import CaseList
 from kase.tui.widgets.case_selector import CaseSelector
 
 
@@ -20,12 +26,14 @@ class CaseSelectorHarness(App[None]):
         case_dir: str,
         enable_multiselect: bool = False,
         exclude_ids: set[str] | None = None,
+        latency_trace: Path | None = None,
     ):
         super().__init__()
         self._repo = CaseRepo(case_dir)
         self.events = []
         self.enable_multiselect = enable_multiselect
         self.exclude_ids = exclude_ids
+        self.latency_trace = latency_trace
 
     def compose(self) -> ComposeResult:
         cases = OrderedDict({case.sf: case for case in self._repo.cases})
@@ -33,6 +41,7 @@ class CaseSelectorHarness(App[None]):
             cases=cases,
             enable_multiselect=self.enable_multiselect,
             exclude_ids=self.exclude_ids,
+            latency_trace=self.latency_trace,
         )
 
     @on(CaseSelector.CaseSelected)
@@ -44,6 +53,32 @@ class CaseSelectorHarness(App[None]):
         self.events.append(event)
 
 
+class StreamingHarness(App[None]):
+    """App hosting a CaseSelector fed from an iterable of cases."""
+
+    def __init__(
+        self, source: Iterable[Case] | AsyncIterable[Case], initial_prompt: str = ""
+    ):
+        super().__init__()
+        self.source = source
+        self.initial_prompt = initial_prompt
+
+    def compose(self) -> ComposeResult:
+        yield CaseSelector(cases=self.source, initial_prompt=self.initial_prompt)
+
+
+def make_cases(count: int, start: int = 1000) -> list[Case]:
+    return [
+        Case(
+            path=Path(f"/cases/{start + i}"),
+            title=f"Streamed Case {i}",
+            desc=f"Streamed description {i}",
+            sf=str(start + i),
+        )
+        for i in range(count)
+    ]
+
+
 class TestCaseSelector:
     """Integration tests validating CaseSelector behavior."""
 
@@ -57,9 +92,9 @@ class TestCaseSelector:
         app = CaseSelectorHarness(case_repo_query_small)
         async with app.run_test() as pilot:
             await pilot.pause()
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
 
-            assert datatable.row_count == 3
+            assert caselist.row_count == 3
 
     async def test_case_selector_filters_cases(self, case_repo_query_small):
         """Filtering through the input should narrow the rows."""
@@ -68,15 +103,15 @@ class TestCaseSelector:
             await pilot.pause()
 
             input_widget = app.query_one(Input)
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
 
             input_widget.value = "Python"
             await pilot.pause(0.2)
-            assert datatable.row_count == 1
+            assert caselist.row_count == 1
 
             input_widget.value = ""
             await pilot.pause(0.2)
-            assert datatable.row_count == 3
+            assert caselist.row_count == 3
 
     async def test_case_selector_preview_updates(self, case_repo_query_small):
         """Highlighting a row should populate the Markdown preview."""
@@ -84,14 +119,14 @@ class TestCaseSelector:
         async with app.run_test() as pilot:
             await pilot.pause()
 
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
             markdown = app.query_one(Markdown)
 
-            datatable.move_cursor(row=1)
+            caselist.move_cursor(row=1)
             await pilot.pause(0.2)
 
             assert markdown is not None
-            assert datatable.row_count > 0
+            assert caselist.row_count > 0
 
     async def test_case_selector_cursor_navigation(self, case_repo_query_small):
         """Keyboard navigation bindings should move the cursor."""
@@ -99,17 +134,17 @@ class TestCaseSelector:
         async with app.run_test() as pilot:
             await pilot.pause()
 
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
             selector = app.query_one(CaseSelector)
-            initial_row = datatable.cursor_row
+            initial_row = caselist.cursor_row
 
             selector.action_cursor_down()
             await pilot.pause()
-            assert datatable.cursor_row == initial_row + 1
+            assert caselist.cursor_row == initial_row + 1
 
             selector.action_cursor_up()
             await pilot.pause()
-            assert datatable.cursor_row == initial_row
+            assert caselist.cursor_row == initial_row
 
     async def test_case_selector_selected_case(self, case_repo_query_small):
         """selected_case returns the current case path when rows exist."""
@@ -132,9 +167,9 @@ class TestCaseSelector:
         """An empty repository should produce zero rows."""
         app = CaseSelectorHarness(case_repo_empty)
         async with app.run_test():
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
 
-            assert datatable.row_count == 0
+            assert caselist.row_count == 0
 
     async def test_case_selector_select_row(self, case_repo_query_small):
         """Selecting a row via Enter should not error."""
@@ -172,10 +207,10 @@ class TestCaseSelector:
         app = CaseSelectorHarness(case_repo_query_small, exclude_ids={"1234"})
         async with app.run_test() as pilot:
             await pilot.pause()
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
 
             # Should only show 2 cases (3 total - 1 excluded)
-            assert datatable.row_count == 2
+            assert caselist.row_count == 2
 
     async def test_case_selector_toggle_exclude_shows_excluded(
         self, case_repo_query_small
@@ -184,25 +219,25 @@ class TestCaseSelector:
         app = CaseSelectorHarness(case_repo_query_small, exclude_ids={"1234"})
         async with app.run_test() as pilot:
             await pilot.pause()
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
             selector = app.query_one(CaseSelector)
 
             # Initially 2 cases visible
-            assert datatable.row_count == 2
+            assert caselist.row_count == 2
 
             # Toggle exclude visibility
             selector.action_toggle_exclude()
             await pilot.pause()
 
             # All 3 cases should be visible now
-            assert datatable.row_count == 3
+            assert caselist.row_count == 3
 
             # Toggle again to hide excluded
             selector.action_toggle_exclude()
             await pilot.pause()
 
             # Back to 2 cases
-            assert datatable.row_count == 2
+            assert caselist.row_count == 2
 
     async def test_case_selector_exclude_respects_filter(self, case_repo_query_small):
         """Filtering should respect the exclude visibility setting."""
@@ -211,13 +246,13 @@ class TestCaseSelector:
             await pilot.pause()
 
             input_widget = app.query_one(Input)
-            datatable = app.query_one(DataTable)
+            caselist = app.query_one(CaseList)
             selector = app.query_one(CaseSelector)
 
             # Filter for "Test Case" should match 2 cases but exclude 1
             input_widget.value = "Test Case"
             await pilot.pause(0.2)
-            assert datatable.row_count == 1  # Only "5678" matches (1234 excluded)
+            assert caselist.row_count == 1  # Only "5678" matches (1234 excluded)
 
             # Show excluded cases
             selector.action_toggle_exclude()
@@ -230,7 +265,7 @@ class TestCaseSelector:
             await pilot.pause(0.2)
 
             # Now both matching cases should be visible
-            assert datatable.row_count == 2
+            assert caselist.row_count == 2
 
     async def test_case_selector_toggle_exclude_disabled_when_empty(
         self, case_repo_query_small
@@ -255,3 +290,405 @@ class TestCaseSelector:
 
             # check_action should return True for toggle_exclude when exclude_ids set
             assert selector.check_action("toggle_exclude", None) is True
+
+
+class TestCaseSelectorStreaming:
+    """Integration tests for populating CaseSelector from a case stream."""
+
+    async def test_streams_all_cases(self):
+        """Every case from an iterable source should end up in the table."""
+        app = StreamingHarness(iter(make_cases(1200)))
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+
+            assert app.query_one(CaseList).row_count == 1200
+            assert len(selector.cases) == 1200
+            assert selector.loading_cases is False
+
+    async def test_first_batch_shown_while_loading(self):
+        """Rows should appear before the source is exhausted."""
+        release = threading.Event()
+
+        def slow_source():
+            yield from make_cases(CaseSelector.FIRST_BATCH_SIZE)
+            release.wait(timeout=5)
+            yield from make_cases(10, start=5000)
+
+        app = StreamingHarness(slow_source())
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            caselist = app.query_one(CaseList)
+
+            assert caselist.row_count == CaseSelector.FIRST_BATCH_SIZE
+            assert selector.loading_cases is True
+            assert app.query_one(".load-status").display is True
+
+            release.set()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            assert caselist.row_count == CaseSelector.FIRST_BATCH_SIZE + 10
+            assert selector.loading_cases is False
+            assert app.query_one(".load-status").display is False
+
+    async def test_first_case_is_read_off_event_loop(self):
+        """A slow listing should not hold up mounting the selector."""
+        release = threading.Event()
+        threads = []
+
+        def slow_source():
+            threads.append(threading.current_thread())
+            release.wait(timeout=5)
+            yield from make_cases(3)
+
+        app = StreamingHarness(slow_source())
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+
+            assert app.query_one(CaseList).row_count == 0
+            assert selector.loading_cases is True
+
+            release.set()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            assert app.query_one(CaseList).row_count == 3
+            assert threading.main_thread() not in threads
+
+    async def test_duplicate_case_numbers_show_the_last_case(self):
+        """A later case with the same SF number should replace the row."""
+        cases = make_cases(3)
+        duplicate = Case(path=Path("/cases/1001"), title="Again", desc="", sf="1001")
+        app = StreamingHarness(iter([*cases, duplicate]))
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            caselist = app.query_one(CaseList)
+
+            assert caselist.row_count == 3
+            assert caselist.case_at(1) is duplicate
+            assert app.query_one(CaseSelector).cases["1001"] is duplicate
+
+    async def test_streams_async_source(self):
+        """Async iterables should be consumed without blocking the UI."""
+
+        async def source():
+            for case in make_cases(30):
+                yield case
+
+        app = StreamingHarness(source())
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            assert app.query_one(CaseList).row_count == 30
+
+    async def test_filter_applies_to_streamed_cases(self):
+        """Cases arriving after the filter was typed should be filtered too."""
+        cases = make_cases(200)
+        cases.append(
+            Case(
+                path=Path("/cases/9999"),
+                title="Python Related Case",
+                desc="Testing Python functionality",
+                sf="9999",
+            )
+        )
+        app = StreamingHarness(iter(cases), initial_prompt="Python")
+        async with app.run_test() as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause(0.2)
+
+            assert app.query_one(CaseList).row_count == 1
+
+    async def test_streamed_cases_are_filtered_by_search_engine(self):
+        """Streamed cases should match a filter as they would on a keystroke."""
+        release = threading.Event()
+
+        def slow_source():
+            yield from make_cases(CaseSelector.FIRST_BATCH_SIZE)
+            yield Case(path=Path("/cases/03819999"), title="B", desc="", sf="03819999")
+            release.wait(timeout=5)
+            # Contains 0381, but not at the start of its number
+            yield Case(path=Path("/cases/12340381"), title="A", desc="", sf="12340381")
+
+        app = StreamingHarness(slow_source(), initial_prompt="0381")
+        async with app.run_test() as pilot:
+            await pilot.pause(0.2)
+            release.set()
+            await app.workers.wait_for_complete()
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            caselist = app.query_one(CaseList)
+
+            expected = [case.sf for case in selector.search.filter("0381")]
+            assert expected == ["03819999"]
+            shown = [caselist.case_at(i).sf for i in range(caselist.row_count)]
+            assert shown == expected
+
+
+class TestCaseSelectorRanked:
+    """Integration tests for the ranked top-K filter mode."""
+
+    async def test_max_results_limits_and_ranks_rows(self):
+        """Only the best max_results matches should be shown, best first."""
+        cases = make_cases(100)
+        cases.append(
+            Case(path=Path("/cases/9000"), title="Streamed", desc="", sf="9000")
+        )
+
+        class RankedHarness(App[None]):
+            def compose(self) -> ComposeResult:
+                yield CaseSelector(
+                    cases=OrderedDict((case.sf, case) for case in cases),
+                    max_results=5,
+                )
+
+        app = RankedHarness()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            caselist = app.query_one(CaseList)
+            assert caselist.row_count == 101
+
+            app.query_one(Input).value = "streamed"
+            await pilot.pause(0.2)
+
+            assert caselist.row_count == 5
+            assert caselist.case_at(0).sf == "9000"
+
+
+class TestCaseSelectorFilterPipeline:
+    """Integration tests for the latest-wins filter pipeline."""
+
+    async def test_latest_input_wins(self, case_repo_query_small):
+        """Rapid edits should converge on the last filter text."""
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            input_widget = app.query_one(Input)
+            caselist = app.query_one(CaseList)
+
+            input_widget.value = "Python"
+            input_widget.value = "Pyth"
+            input_widget.value = "Second"
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+
+            assert caselist.row_count == 1
+            assert caselist.case_at(0).sf == "5678"
+
+    async def test_debounce_follows_filter_cost(self, case_repo_query_small):
+        """Cheap filters run immediately, expensive ones are debounced."""
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+
+            app.query_one(Input).value = "Python"
+            await pilot.pause(0.2)
+            assert selector.debounce < CaseSelector.MAX_DEBOUNCE
+
+            selector._filter_cost = 10.0
+            assert selector.debounce == CaseSelector.MAX_DEBOUNCE
+
+    async def test_scoring_runs_off_event_loop(self, case_repo_query_small, mocker):
+        """Fuzzy scoring should run in a worker thread, not on the UI thread."""
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            threads = []
+            original = selector._filtered_cases
+
+            def record_thread(filter_text):
+                threads.append(threading.current_thread())
+                return original(filter_text)
+
+            mocker.patch.object(selector, "_filtered_cases", side_effect=record_thread)
+
+            app.query_one(Input).value = "Python"
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            assert threads
+            assert threading.main_thread() not in threads
+            assert app.query_one(CaseList).row_count == 1
+
+    async def test_toggle_exclude_filters_off_event_loop(
+        self, case_repo_query_small, mocker
+    ):
+        """Showing excluded cases should filter again in a worker thread."""
+        app = CaseSelectorHarness(case_repo_query_small, exclude_ids={"1234"})
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            app.query_one(Input).value = "Test Case"
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            threads = []
+            original = selector._filtered_cases
+
+            def record_thread(filter_text):
+                threads.append(threading.current_thread())
+                return original(filter_text)
+
+            mocker.patch.object(selector, "_filtered_cases", side_effect=record_thread)
+
+            selector.action_toggle_exclude()
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            assert threads
+            assert threading.main_thread() not in threads
+            assert app.query_one(CaseList).row_count == 2
+
+
+class TestCaseSelectorLatency:
+    """Integration tests for the keystroke to paint latency instrumentation."""
+
+    async def test_latency_is_not_measured_by_default(self, case_repo_query_small):
+        """Without a trace file or the HUD nothing is recorded."""
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.query_one(Input).value = "Python"
+            await pilot.pause(0.2)
+
+            assert app.query_one(CaseSelector).latency is None
+
+    async def test_toggle_latency_hud(self, case_repo_query_small):
+        """F12 shows percentiles of the keystrokes typed since."""
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            hud = app.query_one(".latency-hud", Label)
+            assert not hud.display
+
+            await pilot.press("f12")
+            assert hud.display
+
+            await pilot.press("P", "y")
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            selector = app.query_one(CaseSelector)
+            assert selector.latency is not None
+            assert len(selector.latency.latencies) == 2
+            assert "p99" in str(hud.render())
+
+            await pilot.press("f12")
+            assert not hud.display
+
+    async def test_latency_trace(self, case_repo_query_small, tmp_path):
+        """Every keystroke is written to the trace with its stamps."""
+        trace = tmp_path / "latency.jsonl"
+        app = CaseSelectorHarness(case_repo_query_small, latency_trace=trace)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.query_one(Input).value = "Python"
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+        samples = [json.loads(line) for line in trace.read_text().splitlines()]
+        assert len(samples) == 1
+        sample = samples[0]
+        assert sample["query"] == "Python"
+        stamps = ["input", "score_start", "score_end", "update", "paint"]
+        assert [sample[stamp] for stamp in stamps] == sorted(
+            sample[stamp] for stamp in stamps
+        )
+
+
+class TestCaseSelectorChanges:
+    """Integration tests for applying changes to the case directory."""
+
+    def change(self, kind: ChangeKind, case: Case) -> CaseChange:
+        return CaseChange(kind, case.path, None if kind is ChangeKind.removed else case)
+
+    async def test_added_case_is_shown(self, case_repo_query_small):
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            (case,) = make_cases(1)
+
+            selector.apply_changes([self.change(ChangeKind.added, case)])
+            await pilot.pause()
+
+            caselist = app.query_one(CaseList)
+            assert caselist.row_count == 4
+            assert caselist.case_at(3) is case
+            assert [c.sf for c in selector.search.filter("streamed")] == [case.sf]
+
+    async def test_changed_case_is_replaced_in_place(self, case_repo_query_small):
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            new = Case(
+                path=Path(case_repo_query_small) / "5678",
+                title="Renamed",
+                desc="",
+                sf="5678",
+            )
+
+            selector.apply_changes([self.change(ChangeKind.changed, new)])
+            await pilot.pause()
+
+            caselist = app.query_one(CaseList)
+            assert caselist.row_count == 3
+            assert [caselist.case_at(row) for row in range(3)].count(new) == 1
+            assert selector.cases["5678"] is new
+
+    async def test_removed_case_is_dropped(self, case_repo_query_small):
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            case = selector.cases["9999"]
+
+            selector.apply_changes([self.change(ChangeKind.removed, case)])
+            await pilot.pause()
+
+            assert app.query_one(CaseList).row_count == 2
+            assert "9999" not in selector.cases
+            assert selector.search.filter("python") == []
+
+    async def test_changes_are_filtered(self, case_repo_query_small):
+        app = CaseSelectorHarness(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            selector = app.query_one(CaseSelector)
+            app.query_one(Input).value = "Python"
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            renamed = Case(
+                path=Path(case_repo_query_small) / "5678",
+                title="Python Regression",
+                desc="",
+                sf="5678",
+            )
+
+            selector.apply_changes(
+                [
+                    self.change(ChangeKind.changed, renamed),
+                    self.change(ChangeKind.removed, selector.cases["9999"]),
+                ]
+            )
+            await pilot.pause(0.2)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            caselist = app.query_one(CaseList)
+            assert caselist.row_count == 1
+            assert caselist.case_at(0) is renamed
@@ -0,0 +1,64 @@
+"""Unit tests for the benchmark suite."""
+
+import json
+
+from typer.testing import CliRunner
+
+from kase import bench
+from kase.cases import CaseRepo
+from kase.cli import main
+from kase.importer import SalesforceCSV
+
+
+def test_generate_repo_writes_loadable_cases(tmp_path):
+    bench.generate_repo(tmp_path, 5, desc_length=40)
+
+    cases = list(CaseRepo(str(tmp_path)).cases)
+
+    assert len(cases) == 5
+    assert all(len(case.desc) == 40 for case in cases)
+
+
+def test_generate_csv_matches_importer(tmp_path):
+    csv_file = tmp_path / "cases.csv"
+    bench.generate_csv(csv_file, 5, desc_length=40)
+
+    cases = list(SalesforceCSV(csv_file, tmp_path).cases())
+
+    assert [case.sf for case in cases] == [f"{n:08d}" for n in range(1, 6)]
+
+
+def test_synthetic_cases_are_reproducible(tmp_path):
+    first, second = tmp_path / "first.csv", tmp_path / "second.csv"
+    bench.generate_csv(first, 10, desc_length=100)
+    bench.generate_csv(second, 10, desc_length=100)
+
+    assert first.read_text() == second.read_text()
+
+
+def test_keystroke_latencies_cover_typing_and_deleting(tmp_path):
+    bench.generate_repo(tmp_path, 10, desc_length=40)
+
+    samples = bench.keystroke_latencies(CaseRepo(str(tmp_path)), "disk", rounds=2)
+
+    # "d", "di", "dis", "disk", "dis", "di", "d" in each round
+    assert len(samples) == 14
+
+
+def test_bench_command_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+
+    result = CliRunner().invoke(
+        main,
+        ["bench", "--size", "20", "--desc-length", "50", "--rounds", "1"]
+        + ["--output", str(output)],
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert report["desc_length"] == 50
+    [size] = report["results"]
+    assert size["cases"] == 20
+    assert set(size["filter_latency_s"]) == {"p50", "p95", "p99", "max"}
+    assert size["first_paint_s"] > 0
+    assert size["repo_load_peak_mb"] > 0
@@ -1,9 +1,15 @@
 """Unit tests for the cases module."""
 
 import json
+import os
 from pathlib import Path
 
-from kase.cases import Case, CaseRepo
+import pytest
+
+from kase.cases import CaseRepo, CaseSummary
+from kase.index import CaseIndex
+from kase.model import Case
+from kase.search import SearchKeys
 
 
 class TestCase:
@@ -127,6 +133,22 @@ class TestCaseRepo:
         assert len(metadata) == 2
         assert all(m.name == "case.json" for m in metadata)
 
+    def test_case_ids_lists_case_folders(self, fs, mocker):
+        """Test case_ids names the case folders without loading them."""
+        fs.create_file("/cases/1234/case.json", contents="{not json")
+        fs.create_dir("/cases/5678")
+        fs.create_dir("/cases/.git")
+        fs.create_file("/cases/notes.txt")
+        repo = CaseRepo("/cases")
+        load_meta = mocker.spy(CaseRepo, "_load_meta")
+
+        assert repo.case_ids == {"1234", "5678"}
+        load_meta.assert_not_called()
+
+    def test_case_ids_without_case_dir(self, fs):
+        """Test case_ids is empty if the case directory doesn't exist."""
+        assert CaseRepo("/missing").case_ids == set()
+
     def test_cases_property(self, fs):
         """Test cases property returns Case objects."""
         fs.create_dir("/cases")
@@ -151,7 +173,7 @@ class TestCaseRepo:
 
         assert len(cases) == 1
         case = cases[0]
-        assert isinstance(case, Case)
+        assert isinstance(case, CaseSummary)
         assert case.title == "Test Case"
         assert case.desc == "Test description"
         assert case.sf == "1234"
@@ -321,3 +343,347 @@ class TestCaseRepo:
 
         # Wrong format
         assert CaseRepo.TITLE_RE.match("Test Case [1234]") is None
+
+
+class TestCaseRepoIndex:
+    """Tests for the persistent case index used by CaseRepo.cases."""
+
+    def _write_case(self, fs, sf: str, title: str) -> Path:
+        case_dir = Path("/cases") / sf
+        fs.create_file(
+            case_dir / "case.json",
+            contents=json.dumps(
+                {"title": title, "desc": f"{title} description", "sf": sf, "lp": ""}
+            ),
+        )
+        return case_dir
+
+    def test_cases_writes_index(self, fs):
+        """Loading cases should persist an index inside the case directory."""
+        fs.create_dir("/cases")
+        self._write_case(fs, "1234", "Test Case")
+
+        list(CaseRepo("/cases").cases)
+
+        index_file = Path("/cases") / CaseRepo.INDEX_FILE
+        assert index_file.exists()
+        data = json.loads(index_file.read_text())
+        assert data["cases"]["1234"]["data"]["title"] == "Test Case"
+
+    def test_unchanged_cases_are_served_from_index(self, fs, mocker):
+        """A second load should not parse case.json files that did not change."""
+        fs.create_dir("/cases")
+        self._write_case(fs, "1234", "Test Case")
+        list(CaseRepo("/cases").cases)
+
+        load_meta = mocker.spy(CaseRepo, "_load_meta")
+        cases = list(CaseRepo("/cases").cases)
+
+        load_meta.assert_not_called()
+        assert [case.title for case in cases] == ["Test Case"]
+        assert cases[0].path == Path("/cases/1234")
+
+    def test_changed_case_is_reloaded(self, fs):
+        """A case.json modified after indexing should be re-read."""
+        fs.create_dir("/cases")
+        case_dir = self._write_case(fs, "1234", "Test Case")
+        list(CaseRepo("/cases").cases)
+
+        metadata_file = case_dir / "case.json"
+        metadata_file.write_text(
+            json.dumps({"title": "Renamed Case", "desc": "New", "sf": "1234", "lp": ""})
+        )
+        os.utime(metadata_file, ns=(0, 1))
+
+        cases = list(CaseRepo("/cases").cases)
+
+        assert [case.title for case in cases] == ["Renamed Case"]
+
+    def test_removed_case_is_dropped_from_index(self, fs):
+        """Entries for deleted cases should not survive the next load."""
+        fs.create_dir("/cases")
+        self._write_case(fs, "1234", "First")
+        removed = self._write_case(fs, "5678", "Second")
+        list(CaseRepo("/cases").cases)
+
+        fs.remove_object(str(removed / "case.json"))
+        cases = list(CaseRepo("/cases").cases)
+
+        assert [case.sf for case in cases] == ["1234"]
+        data = json.loads((Path("/cases") / CaseRepo.INDEX_FILE).read_text())
+        assert set(data["cases"]) == {"1234"}
+
+    def test_use_index_false_does_not_write_index(self, fs):
+        """Disabling the index should leave the case directory untouched."""
+        fs.create_dir("/cases")
+        self._write_case(fs, "1234", "Test Case")
+
+        cases = list(CaseRepo("/cases", use_index=False).cases)
+
+        assert len(cases) == 1
+        assert not (Path("/cases") / CaseRepo.INDEX_FILE).exists()
+
+
+class TestCaseRepoConcurrentLoading:
+    """Tests for loading cases on a thread pool."""
+
+    def _create_cases(self, fs, count: int) -> None:
+        for i in range(count):
+            sf = str(1000 + i)
+            fs.create_file(
+                f"/cases/{sf}/case.json",
+                contents=json.dumps(
+                    {"title": f"Case {i}", "desc": "", "sf": sf, "lp": ""}
+                ),
+            )
+
+    def test_jobs_preserve_metadata_order(self, fs):
+        """Concurrent loading should yield cases in the same order as metadata."""
+        self._create_cases(fs, 20)
+        repo = CaseRepo("/cases", use_index=False, jobs=4)
+
+        cases = list(repo.cases)
+
+        assert [case.path for case in cases] == [m.parent for m in repo.metadata]
+
+    def test_jobs_match_sequential_results(self, fs):
+        """Concurrent and sequential loading should produce the same cases."""
+        self._create_cases(fs, 20)
+
+        sequential = list(CaseRepo("/cases", use_index=False).cases)
+        concurrent = list(CaseRepo("/cases", use_index=False, jobs=8).cases)
+
+        assert concurrent == sequential
+
+    def test_broken_case_is_reported_not_raised(self, fs):
+        """A malformed case.json should be skipped and recorded in errors."""
+        self._create_cases(fs, 3)
+        fs.create_file("/cases/2000/case.json", contents="{not json")
+        repo = CaseRepo("/cases", jobs=2)
+
+        cases = list(repo.cases)
+
+        assert len(cases) == 3
+        assert [error.path for error in repo.errors] == [Path("/cases/2000/case.json")]
+        assert isinstance(repo.errors[0].error, ValueError)
+
+    def test_broken_case_is_not_indexed(self, fs):
+        """Failed loads should be retried on the next run rather than cached."""
+        fs.create_file("/cases/2000/case.json", contents="{}")
+        repo = CaseRepo("/cases")
+
+        assert list(repo.cases) == []
+        assert len(repo.errors) == 1
+        assert list(repo.cases) == []
+        assert len(repo.errors) == 1
+
+
+class TestCaseSearchKeys:
+    """Tests for the cached search keys of a case."""
+
+    def test_search_keys_are_cached(self):
+        """Search keys should only be computed once per case."""
+        case = Case(path=Path("/tmp/test"), title="Title", desc="Desc", sf="1234")
+
+        assert case.search_keys is case.search_keys
+        assert case.search_keys.title == "title"
+
+    def test_search_keys_do_not_affect_equality(self):
+        """Computing search keys should not change how cases compare."""
+        first = Case(path=Path("/tmp/test"), title="Title", desc="Desc", sf="1234")
+        second = Case(path=Path("/tmp/test"), title="Title", desc="Desc", sf="1234")
+        _ = first.search_keys
+
+        assert first == second
+        assert "search_keys" not in first.model_dump()
+
+    def test_search_keys_are_served_from_index(self, fs, mocker):
+        """Cases loaded from the index should reuse the persisted search keys."""
+        fs.create_file(
+            "/cases/1234/case.json",
+            contents=json.dumps(
+                {"title": "Title", "desc": "Desc", "sf": "1234", "lp": ""}
+            ),
+        )
+        expected = Case(
+            path=Path("/cases/1234"), title="Title", desc="Desc", sf="1234"
+        ).search_keys
+        list(CaseRepo("/cases").cases)
+
+        build = mocker.spy(SearchKeys, "build")
+        case = list(CaseRepo("/cases").cases)[0]
+
+        assert case.search_keys == expected
+        build.assert_not_called()
+        assert "desc" not in case.__dict__
+
+
+class TestCaseSummaries:
+    """Tests for listing cases without loading their descriptions."""
+
+    def _write_case(self, fs, sf: str, desc: str = "Long description") -> None:
+        fs.create_file(
+            f"/cases/{sf}/case.json",
+            contents=json.dumps(
+                {"title": f"Case {sf}", "desc": desc, "sf": sf, "lp": ""}
+            ),
+        )
+
+    def test_listed_cases_leave_description_unloaded(self, fs):
+        """Listing should only load the summary fields of each case."""
+        self._write_case(fs, "1234")
+
+        for use_index in (True, True, False):
+            case = list(CaseRepo("/cases", use_index=use_index).cases)[0]
+            assert case.title == "Case 1234"
+            assert case._desc is None
+
+    def test_description_is_loaded_on_demand(self, fs):
+        """Accessing desc should read it from case.json."""
+        self._write_case(fs, "1234")
+        case = list(CaseRepo("/cases").cases)[0]
+
+        assert case.desc == "Long description"
+        assert "Long description" in case.preview
+
+    def test_index_does_not_store_descriptions(self, fs):
+        """The summary index should only hold the summary fields."""
+        self._write_case(fs, "1234")
+        list(CaseRepo("/cases").cases)
+
+        data = json.loads((Path("/cases") / CaseRepo.INDEX_FILE).read_text())
+        assert set(data["cases"]["1234"]["data"]) == {"title", "sf", "lp"}
+
+    def test_stale_search_keys_are_rebuilt(self, fs):
+        """Search keys indexed for another version of a case are not used."""
+        self._write_case(fs, "1234")
+        list(CaseRepo("/cases").cases)
+        path = Path("/cases") / CaseRepo.SEARCH_INDEX_FILE
+        data = json.loads(path.read_text())
+        data["cases"]["1234"]["mtime_ns"] = 0
+        data["cases"]["1234"]["data"]["text"] = "stale"
+        path.write_text(json.dumps(data))
+
+        case = list(CaseRepo("/cases").cases)[0]
+
+        assert case.search_keys.text.endswith("long description")
+
+    def test_changed_case_updates_search_keys(self, fs):
+        """Re-reading a changed case should refresh its indexed search keys."""
+        self._write_case(fs, "1234", "Old")
+        list(CaseRepo("/cases").cases)
+
+        metadata_file = Path("/cases/1234/case.json")
+        metadata_file.write_text(
+            json.dumps({"title": "Case 1234", "desc": "New", "sf": "1234", "lp": ""})
+        )
+        os.utime(metadata_file, ns=(0, 1))
+        list(CaseRepo("/cases").cases)
+
+        case = list(CaseRepo("/cases").cases)[0]
+
+        assert case.search_keys.text.endswith("new")
+        assert case._desc is None
+
+    def test_search_index_drops_removed_cases(self, fs):
+        """Search keys of deleted cases should not survive the next load."""
+        self._write_case(fs, "1234")
+        self._write_case(fs, "5678")
+        list(CaseRepo("/cases").cases)
+
+        fs.remove_object("/cases/5678/case.json")
+        list(CaseRepo("/cases").cases)
+
+        path = Path("/cases") / CaseRepo.SEARCH_INDEX_FILE
+        assert set(json.loads(path.read_text())["cases"]) == {"1234"}
+
+    def test_deleted_search_index_is_rebuilt(self, fs):
+        """A search index lost while the summary index is current is rebuilt."""
+        self._write_case(fs, "1234")
+        self._write_case(fs, "5678")
+        list(CaseRepo("/cases").cases)
+        path = Path("/cases") / CaseRepo.SEARCH_INDEX_FILE
+        path.unlink()
+
+        list(CaseRepo("/cases").cases)
+
+        data = json.loads(path.read_text())
+        assert set(data["cases"]) == {"1234", "5678"}
+        assert data["cases"]["1234"]["data"]["text"].endswith("long description")
+
+    def test_search_index_older_than_summaries_is_repaired(self, fs):
+        """Cases missing from a search index that failed to save are added."""
+        self._write_case(fs, "1234")
+        list(CaseRepo("/cases").cases)
+        path = Path("/cases") / CaseRepo.SEARCH_INDEX_FILE
+        data = json.loads(path.read_text())
+        del data["cases"]["1234"]
+        path.write_text(json.dumps(data))
+        os.utime(path, ns=(0, 0))
+
+        list(CaseRepo("/cases").cases)
+
+        assert set(json.loads(path.read_text())["cases"]) == {"1234"}
+
+    def test_current_search_index_is_not_rewritten(self, fs, mocker):
+        """Listing unchanged cases should not touch an intact search index."""
+        self._write_case(fs, "1234")
+        list(CaseRepo("/cases").cases)
+        save = mocker.spy(CaseIndex, "save")
+
+        list(CaseRepo("/cases").cases)
+
+        save.assert_not_called()
+
+    def test_loaded_case_round_trips(self, fs):
+        """The full case of a summary should serialize with its description."""
+        self._write_case(fs, "1234")
+        case = list(CaseRepo("/cases").cases)[0].load()
+
+        assert case.write_metadata(clobber=True)
+
+        data = case.model_dump()
+        assert data["desc"] == "Long description"
+        assert Case.model_validate(data) == case
+        assert Case.from_folder(Path("/cases/1234")) == case
+
+    def test_description_of_removed_case_raises(self, fs):
+        """A description that can't be read should not come back empty."""
+        self._write_case(fs, "1234")
+        case = list(CaseRepo("/cases").cases)[0]
+        fs.remove_object("/cases/1234/case.json")
+
+        with pytest.raises(FileNotFoundError):
+            _ = case.desc
+        assert "case 1234" in case.search_keys.text
+
+
+class TestCaseMtime:
+    """Tests for the modification time of a case."""
+
+    def test_mtime_is_read_from_case_json(self, fs):
+        """mtime_ns should come from the case.json file."""
+        fs.create_file("/cases/1234/case.json", contents="{}")
+        case = Case(path=Path("/cases/1234"), title="Title", desc="Desc", sf="1234")
+
+        assert case.mtime_ns == os.stat("/cases/1234/case.json").st_mtime_ns
+
+    def test_mtime_is_none_without_case_json(self, fs):
+        """Cases that were never written should have no mtime."""
+        case = Case(path=Path("/cases/1234"), title="Title", desc="Desc", sf="1234")
+
+        assert case.mtime_ns is None
+
+    def test_mtime_is_set_when_loading(self, fs):
+        """Loading a case should record the mtime it was loaded at."""
+        fs.create_file(
+            "/cases/1234/case.json",
+            contents=json.dumps(
+                {"title": "Title", "desc": "Desc", "sf": "1234", "lp": ""}
+            ),
+        )
+        expected = os.stat("/cases/1234/case.json").st_mtime_ns
+
+        for _ in range(2):
+            case = list(CaseRepo("/cases").cases)[0]
+            assert case.__dict__["mtime_ns"] == expected
@@ -1,10 +1,15 @@
 """Unit tests for the CLI module."""
 
+import json
 import os
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from typer.testing import CliRunner
 
+from kase.cases import CaseLoadError
 from kase.cli import DEFAULT_CASE_DIR, main
 
 runner = CliRunner()
@@ -29,7 +34,7 @@ class TestCLI:
         assert "kase query" in result.stdout
         assert "cd" in result.stdout
 
-    @patch("kase.cli.QueryApp")
+    @patch("kase.tui.query.QueryApp")
     def test_query_command_default_case_dir(self, mock_query_app):
         """Test query command with default case directory."""
         mock_app_instance = MagicMock()
@@ -41,7 +46,7 @@ class TestCLI:
         assert result.exit_code == 0
         mock_query_app.assert_called_once()
 
-    @patch("kase.cli.QueryApp")
+    @patch("kase.tui.query.QueryApp")
     def test_query_command_custom_case_dir(self, mock_query_app):
         """Test query command with custom case directory."""
         mock_app_instance = MagicMock()
@@ -52,10 +57,54 @@ class TestCLI:
 
         assert result.exit_code == 0
         mock_query_app.assert_called_once_with(
-            initial_prompt="", case_dir="/custom/path"
+            initial_prompt="",
+            case_dir="/custom/path",
+            jobs=1,
+            max_results=None,
+            latency_trace=None,
         )
 
-    @patch("kase.cli.QueryApp")
+    @patch("kase.tui.query.QueryApp")
+    def test_query_command_jobs_option(self, mock_query_app):
+        """Test query command forwards --jobs to the app."""
+        mock_app_instance = MagicMock()
+        mock_app_instance.run.return_value = None
+        mock_query_app.return_value = mock_app_instance
+
+        result = runner.invoke(main, ["query", "--jobs", "8"])
+
+        assert result.exit_code == 0
+        assert mock_query_app.call_args.kwargs["jobs"] == 8
+
+    @patch("kase.tui.query.QueryApp")
+    def test_query_command_max_results_option(self, mock_query_app):
+        """Test query command forwards --max-results to the app."""
+        mock_app_instance = MagicMock()
+        mock_app_instance.run.return_value = None
+        mock_query_app.return_value = mock_app_instance
+
+        result = runner.invoke(main, ["query", "--max-results", "20"])
+
+        assert result.exit_code == 0
+        assert mock_query_app.call_args.kwargs["max_results"] == 20
+
+    @patch("kase.tui.query.QueryApp")
+    def test_query_command_reports_load_errors(self, mock_query_app):
+        """Test query command reports case files that failed to load."""
+        mock_app_instance = MagicMock()
+        mock_app_instance.run.return_value = None
+        mock_app_instance.repo.errors = [
+            CaseLoadError(Path("/cases/1234/case.json"), ValueError("bad json"))
+        ]
+        mock_query_app.return_value = mock_app_instance
+
+        result = runner.invoke(main, ["query"])
+
+        assert result.exit_code == 0
+        assert "Skipped /cases/1234/case.json: bad json" in result.stderr
+        assert "Skipped" not in result.stdout
+
+    @patch("kase.tui.query.QueryApp")
     def test_query_command_with_result(self, mock_query_app):
         """Test query command prints result when returned."""
         mock_app_instance = MagicMock()
@@ -69,7 +118,7 @@ class TestCLI:
         assert result.exit_code == 0
         assert "/path/to/case" in result.stdout
 
-    @patch("kase.cli.InitApp")
+    @patch("kase.tui.init.InitApp")
     @patch.dict(os.environ, {}, clear=True)
     def test_init_command(self, mock_init_app):
         """Test init command."""
@@ -82,7 +131,7 @@ class TestCLI:
         assert result.exit_code == 0
         mock_init_app.assert_called_once_with(DEFAULT_CASE_DIR)
 
-    @patch("kase.cli.InitApp")
+    @patch("kase.tui.init.InitApp")
     def test_init_command_honors_env_case_dir(self, mock_init_app):
         """Test init command uses CASE_DIR environment variable when provided."""
         mock_app_instance = MagicMock()
@@ -96,7 +145,7 @@ class TestCLI:
         assert result.exit_code == 0
         mock_init_app.assert_called_once_with(env_case_dir)
 
-    @patch("kase.cli.InitApp")
+    @patch("kase.tui.init.InitApp")
     def test_init_command_with_result(self, mock_init_app):
         """Test init command prints result when returned."""
         mock_app_instance = MagicMock()
@@ -108,7 +157,7 @@ class TestCLI:
         assert result.exit_code == 0
         assert "Case created successfully." in result.stdout
 
-    @patch("kase.cli.QueryApp")
+    @patch("kase.tui.query.QueryApp")
     def test_default_command_invokes_query(self, mock_query_app):
         """Test that default command (no subcommand) invokes query."""
         mock_app_instance = MagicMock()
@@ -120,7 +169,7 @@ class TestCLI:
         assert result.exit_code == 0
         mock_query_app.assert_called_once()
 
-    @patch("kase.cli.ImporterApp")
+    @patch("kase.tui.importer.ImporterApp")
     def test_import_command_creates_new_case(self, mock_importer_app, tmp_path):
         """Test import command writes metadata when case is new."""
         # Use tmp_path here because pyfakefs breaks Typer's Path type introspection
@@ -130,6 +179,8 @@ class TestCLI:
         case.sf = "12345"
         case.path = tmp_path / "12345"
         case.write_metadata = MagicMock()
+        # The app returns cases listed from the export, which load the full case
+        case.load.return_value = case
 
         mock_app_instance = MagicMock()
         mock_app_instance.run.return_value = [case]
@@ -141,7 +192,7 @@ class TestCLI:
         assert "Creating 12345" in result.stdout
         case.write_metadata.assert_called_once_with()
 
-    @patch("kase.cli.ImporterApp")
+    @patch("kase.tui.importer.ImporterApp")
     def test_import_command_skips_when_user_declines_overwrite(
         self, mock_importer_app, tmp_path
     ):
@@ -156,6 +207,7 @@ class TestCLI:
         case.sf = "12345"
         case.path = metadata_dir
         case.write_metadata = MagicMock()
+        case.load.return_value = case
 
         mock_app_instance = MagicMock()
         mock_app_instance.run.return_value = [case]
@@ -168,7 +220,7 @@ class TestCLI:
         assert "Skipping 12345" in result.stdout
         case.write_metadata.assert_not_called()
 
-    @patch("kase.cli.ImporterApp")
+    @patch("kase.tui.importer.ImporterApp")
     def test_import_command_overwrites_when_confirmed(
         self, mock_importer_app, tmp_path
     ):
@@ -183,6 +235,7 @@ class TestCLI:
         case.sf = "12345"
         case.path = metadata_dir
         case.write_metadata = MagicMock()
+        case.load.return_value = case
 
         mock_app_instance = MagicMock()
         mock_app_instance.run.return_value = [case]
@@ -193,3 +246,322 @@ class TestCLI:
         assert result.exit_code == 0
         assert "Overwriting 12345" in result.stdout
         case.write_metadata.assert_called_once_with(clobber=True)
+
+
+class TestBulkImport:
+    """Tests for importing every case of an export with --all."""
+
+    @staticmethod
+    def write_export(tmp_path: Path, rows: list[tuple[str, str, str]]) -> Path:
+        csv_file = tmp_path / "cases.csv"
+        lines = ["Case Number,Subject,Description", *(",".join(r) for r in rows)]
+        csv_file.write_text("\n".join(lines) + "\n")
+        return csv_file
+
+    @staticmethod
+    def write_case(case_dir: Path, sf: str, title: str, mtime: float) -> Path:
+        metadata_file = case_dir / sf / "case.json"
+        metadata_file.parent.mkdir(parents=True)
+        metadata_file.write_text(
+            json.dumps({"title": title, "desc": "", "sf": sf, "lp": ""})
+        )
+        os.utime(metadata_file, (mtime, mtime))
+        return metadata_file
+
+    @staticmethod
+    def unwrap(output: str) -> str:
+        """Undo the line wrapping of rich"""
+        return " ".join(output.split())
+
+    @patch("kase.tui.importer.ImporterApp")
+    def test_all_imports_without_app(self, mock_importer_app, tmp_path):
+        """Test --all writes every case without opening the fuzzy finder."""
+        csv_file = self.write_export(
+            tmp_path, [("1000", "First", "One"), ("2000", "Second", "Two")]
+        )
+        case_dir = tmp_path / "cases"
+
+        result = runner.invoke(
+            main, ["import", str(csv_file), "--all", "--case-dir", str(case_dir)]
+        )
+
+        assert result.exit_code == 0
+        mock_importer_app.assert_not_called()
+        assert "Processed 2 cases" in self.unwrap(result.stdout)
+        assert "2 created" in self.unwrap(result.stdout)
+        assert "cases/s" in self.unwrap(result.stdout)
+        data = json.loads((case_dir / "2000" / "case.json").read_text())
+        assert data["desc"] == "Two"
+
+    def test_all_skips_existing_cases_by_default(self, tmp_path):
+        """Test --all keeps existing case.json files unless told otherwise."""
+        csv_file = self.write_export(tmp_path, [("1000", "New title", "One")])
+        case_dir = tmp_path / "cases"
+        metadata_file = self.write_case(case_dir, "1000", "Old title", 0)
+
+        result = runner.invoke(
+            main, ["import", str(csv_file), "--all", "--case-dir", str(case_dir)]
+        )
+
+        assert result.exit_code == 0
+        assert "1 skipped" in self.unwrap(result.stdout)
+        assert json.loads(metadata_file.read_text())["title"] == "Old title"
+
+    def test_on_conflict_overwrite(self, tmp_path):
+        """Test --on-conflict overwrite replaces existing case.json files."""
+        csv_file = self.write_export(tmp_path, [("1000", "New title", "One")])
+        case_dir = tmp_path / "cases"
+        metadata_file = self.write_case(case_dir, "1000", "Old title", 0)
+
+        result = runner.invoke(
+            main,
+            ["import", str(csv_file), "--all", "--on-conflict", "overwrite"]
+            + ["--case-dir", str(case_dir)],
+        )
+
+        assert result.exit_code == 0
+        assert "1 overwritten" in self.unwrap(result.stdout)
+        assert json.loads(metadata_file.read_text())["title"] == "New title"
+
+    def test_on_conflict_newer(self, tmp_path):
+        """Test --on-conflict newer only replaces cases older than the export."""
+        csv_file = self.write_export(
+            tmp_path, [("1000", "New title", "One"), ("2000", "New title", "Two")]
+        )
+        exported = csv_file.stat().st_mtime
+        case_dir = tmp_path / "cases"
+        older = self.write_case(case_dir, "1000", "Old title", exported - 60)
+        newer = self.write_case(case_dir, "2000", "Edited title", exported + 60)
+
+        result = runner.invoke(
+            main,
+            ["import", str(csv_file), "--all", "--on-conflict", "newer"]
+            + ["--case-dir", str(case_dir)],
+        )
+
+        assert result.exit_code == 0
+        assert json.loads(older.read_text())["title"] == "New title"
+        assert json.loads(newer.read_text())["title"] == "Edited title"
+
+    def test_partial_failure_exits_non_zero(self, tmp_path):
+        """Test cases that can't be written are reported and fail the command."""
+        csv_file = self.write_export(
+            tmp_path, [("1000", "First", "One"), ("2000", "Second", "Two")]
+        )
+        case_dir = tmp_path / "cases"
+        case_dir.mkdir()
+        # A file where the case folder should be
+        (case_dir / "1000").write_text("")
+
+        result = runner.invoke(
+            main, ["import", str(csv_file), "--all", "--case-dir", str(case_dir)]
+        )
+
+        assert result.exit_code == 1
+        assert "Failed to import 1000" in self.unwrap(result.stderr)
+        assert "1 created" in self.unwrap(result.stdout)
+        assert "1 failed" in self.unwrap(result.stdout)
+        assert (case_dir / "2000" / "case.json").exists()
+
+    def test_invalid_export_imports_nothing(self, tmp_path):
+        """Test a row missing a value stops the import before writing."""
+        csv_file = self.write_export(
+            tmp_path, [("1000", "First", "One"), ("2000", "", "Two")]
+        )
+        case_dir = tmp_path / "cases"
+
+        result = runner.invoke(
+            main, ["import", str(csv_file), "--all", "--case-dir", str(case_dir)]
+        )
+
+        assert result.exit_code == 1
+        assert "Row 3 is missing" in self.unwrap(result.stderr)
+        assert not case_dir.exists()
+
+
+class TestHeadlessQuery:
+    """Tests for printing matches with --print instead of running the TUI."""
+
+    @patch("kase.tui.query.QueryApp")
+    def test_print_does_not_start_app(self, mock_query_app, case_repo_query_small):
+        """--print should list matching case paths without the TUI."""
+        result = runner.invoke(
+            main, ["query", "--print", "--case-dir", case_repo_query_small, "python"]
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout == f"{Path(case_repo_query_small) / '9999'}\n"
+        mock_query_app.assert_not_called()
+
+    def test_print_without_prompt_lists_every_case(self, case_repo_query_small):
+        """An empty prompt should print every case."""
+        result = runner.invoke(
+            main, ["query", "--filter", "--case-dir", case_repo_query_small]
+        )
+
+        assert result.exit_code == 0
+        assert len(result.stdout.splitlines()) == 3
+
+    def test_print_limit(self, case_repo_query_small):
+        """--limit should cap the number of printed cases."""
+        result = runner.invoke(
+            main,
+            ["query", "--print", "--limit", "1", "--case-dir", case_repo_query_small],
+        )
+
+        assert result.exit_code == 0
+        assert len(result.stdout.splitlines()) == 1
+
+    def test_print_json(self, case_repo_query_small):
+        """--format json should print one JSON object per case."""
+        result = runner.invoke(
+            main,
+            [
+                "query",
+                "--print",
+                "--format",
+                "json",
+                "--case-dir",
+                case_repo_query_small,
+                "second",
+            ],
+        )
+
+        assert result.exit_code == 0
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [record["sf"] for record in records] == ["5678"]
+        assert records[0]["title"] == "Second Test Case"
+        assert records[0]["lp"] == "LP#2222"
+
+    def test_print_nul(self, case_repo_query_small):
+        """--format nul should terminate each record with a NUL byte."""
+        result = runner.invoke(
+            main,
+            [
+                "query",
+                "--print",
+                "--format",
+                "nul",
+                "--case-dir",
+                case_repo_query_small,
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout.count("\0") == 3
+        assert "\n" not in result.stdout
+
+    def test_punch_print(self, case_repo_query_small):
+        """punch --print should print the punch line of each match."""
+        result = runner.invoke(
+            main,
+            [
+                "punch",
+                "--print",
+                "--max-length",
+                "6",
+                "--case-dir",
+                case_repo_query_small,
+                "python",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout == "[9999] Python...\n"
+
+    def test_print_does_not_import_textual(self, case_repo_query_small):
+        """The headless mode should not pay for importing the TUI."""
+        result = run_python(
+            "import sys\n"
+            "from kase.cli import main\n"
+            "try:\n"
+            "    main(['query', '--print', '--case-dir', sys.argv[1]])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "assert 'textual' not in sys.modules\n",
+            case_repo_query_small,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert len(result.stdout.splitlines()) == 3
+
+
+class TestStartupBudget:
+    """The CLI runs from every new shell, so importing it must stay cheap."""
+
+    # Cumulative time to import kase.cli, in microseconds; about a third of
+    # this is typer and click on a typical machine
+    IMPORT_BUDGET_US = 300_000
+
+    HEAVY_MODULES = ["textual", "rich", "pydantic", "rapidfuzz", "kase.cases"]
+
+    def test_lightweight_commands_import_no_heavy_modules(self):
+        """shell and --version should not import the TUI or the case model."""
+        for args in (["shell"], ["--version"]):
+            result = run_python(
+                "import sys\n"
+                "from kase.cli import main\n"
+                "try:\n"
+                "    main(sys.argv[1:])\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                f"heavy = [m for m in {self.HEAVY_MODULES!r} if m in sys.modules]\n"
+                "assert not heavy, heavy\n",
+                *args,
+            )
+
+            assert result.returncode == 0, result.stderr
+
+    def test_printing_indexed_cases_needs_no_model_or_fuzzy_matcher(self, tmp_path):
+        """Listing and number lookups from warm indexes skip pydantic and rapidfuzz."""
+        from kase.cases import CaseRepo
+
+        (tmp_path / "1234").mkdir()
+        (tmp_path / "1234" / "case.json").write_text(
+            json.dumps({"title": "Case", "desc": "Desc", "sf": "1234", "lp": ""})
+        )
+        list(CaseRepo(str(tmp_path)).cases)
+
+        for query in ("", "123"):
+            result = run_python(
+                "import sys\n"
+                "from kase.cli import main\n"
+                "try:\n"
+                "    main(sys.argv[1:])\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                "heavy = [m for m in ('pydantic', 'rapidfuzz') if m in sys.modules]\n"
+                "assert not heavy, heavy\n",
+                "query",
+                query,
+                "--print",
+                "--case-dir",
+                str(tmp_path),
+            )
+
+            assert result.returncode == 0, result.stderr
+            assert result.stdout == f"{tmp_path / '1234'}\n"
+
+    def test_import_time_within_budget(self):
+        """Importing kase.cli should stay within IMPORT_BUDGET_US."""
+        result = run_python("import kase.cli", options=["-X", "importtime"])
+
+        assert result.returncode == 0, result.stderr
+        # The last line of -X importtime is the top-level import
+        *_, last = result.stderr.strip().splitlines()
+        _, cumulative, module = (field.strip() for field in last.split("|"))
+        assert module == "kase.cli"
+        assert int(cumulative) < self.IMPORT_BUDGET_US
+
+
+def run_python(
+    code: str, *args: str, options: list[str] | None = None
+) -> subprocess.CompletedProcess[str]:
+    """Run code in a fresh interpreter, where no module is imported yet"""
+    src = Path(__file__).parents[2] / "src"
+    return subprocess.run(
+        [sys.executable, *(options or []), "-c", code, *args],
+        env={**os.environ, "PYTHONPATH": str(src)},
+        capture_output=True,
+        text=True,
+    )
@@ -0,0 +1,187 @@
+"""Unit tests for the case daemon and its clients."""
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from kase import daemon
+from kase.cases import CaseRepo
+from kase.cli import main
+from kase.headless import find_cases
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def runtime_dir(monkeypatch):
+    """A short private runtime directory, as socket paths are length limited."""
+    with tempfile.TemporaryDirectory(prefix="kase-") as folder:
+        monkeypatch.setenv("XDG_RUNTIME_DIR", folder)
+        yield Path(folder)
+
+
+@pytest.fixture
+def serve(runtime_dir):
+    """Start a daemon for a case directory on a background thread."""
+    servers = []
+
+    def _serve(case_dir: str) -> daemon.CaseDaemon:
+        case_daemon = daemon.CaseDaemon(case_dir)
+        server = daemon.make_server(case_daemon, daemon.socket_path(case_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return case_daemon
+
+    yield _serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def write_case(case_dir: Path, sf: str, title: str) -> None:
+    folder = case_dir / sf
+    folder.mkdir()
+    (folder / "case.json").write_text(
+        json.dumps({"title": title, "desc": f"About {title}", "sf": sf, "lp": ""})
+    )
+
+
+def test_socket_path_is_per_case_dir(runtime_dir):
+    first = daemon.socket_path("/cases/one")
+    second = daemon.socket_path("/cases/two")
+
+    assert first != second
+    assert first.parent == runtime_dir / "kase"
+
+
+def test_open_repo_without_daemon(runtime_dir, case_repo_query_small):
+    repo = daemon.open_repo(case_repo_query_small)
+
+    assert type(repo) is CaseRepo
+
+
+def test_daemon_lists_cases(serve, case_repo_query_small):
+    serve(case_repo_query_small)
+
+    repo = daemon.open_repo(case_repo_query_small)
+    cases = list(repo.cases)
+
+    assert isinstance(repo, daemon.DaemonRepo)
+    assert [case.sf for case in cases] == [
+        case.sf for case in CaseRepo(case_repo_query_small).cases
+    ]
+    # Descriptions are still read on demand
+    assert cases[0].desc
+
+
+def test_daemon_searches(serve, case_repo_query_small):
+    serve(case_repo_query_small)
+    repo = daemon.open_repo(case_repo_query_small)
+
+    matches = list(find_cases(repo, "python"))
+
+    assert [case.sf for case in matches] == ["9999"]
+
+
+def test_daemon_picks_up_new_cases(serve, tmp_path):
+    write_case(tmp_path, "1000", "First")
+    case_daemon = serve(str(tmp_path))
+    stop = threading.Event()
+    changes = case_daemon.repo.watch(case_daemon.cases, stop)
+    write_case(tmp_path, "2000", "Second")
+
+    case_daemon.apply_changes(next(changes))
+    stop.set()
+    changes.close()
+    cases = list(daemon.open_repo(str(tmp_path)).cases)
+    assert sorted(case.sf for case in cases) == ["1000", "2000"]
+
+
+def test_daemon_reports_load_errors(serve, tmp_path):
+    write_case(tmp_path, "1000", "First")
+    (tmp_path / "2000").mkdir()
+    (tmp_path / "2000" / "case.json").write_text("{not json")
+    serve(str(tmp_path))
+
+    repo = daemon.open_repo(str(tmp_path))
+    list(repo.cases)
+
+    assert [error.path for error in repo.errors] == [tmp_path / "2000" / "case.json"]
+
+
+def test_falls_back_when_daemon_is_gone(runtime_dir, case_repo_query_small):
+    path = daemon.socket_path(case_repo_query_small)
+    path.parent.mkdir(mode=0o700)
+    path.touch()
+
+    repo = daemon.open_repo(case_repo_query_small)
+
+    assert isinstance(repo, daemon.DaemonRepo)
+    assert len(list(repo.cases)) == 3
+    assert [case.sf for case in find_cases(repo, "python")] == ["9999"]
+
+
+def test_unknown_request(serve, case_repo_query_small):
+    serve(case_repo_query_small)
+
+    with pytest.raises(daemon.DaemonUnavailable, match="unknown op"):
+        daemon.request(daemon.socket_path(case_repo_query_small), {"op": "stop"})
+
+
+def test_refuses_to_replace_running_daemon(serve, case_repo_query_small):
+    case_daemon = serve(case_repo_query_small)
+
+    with pytest.raises(FileExistsError):
+        daemon.make_server(case_daemon, daemon.socket_path(case_repo_query_small))
+
+
+def test_print_uses_daemon(serve, tmp_path):
+    write_case(tmp_path, "1000", "Kernel panic")
+    case_daemon = serve(str(tmp_path))
+    # Only the daemon knows about this case until the watcher reports it
+    case_daemon.cases.append(
+        CaseRepo(str(tmp_path))._summary(
+            tmp_path / "2000", {"title": "Kernel oops", "sf": "2000", "lp": ""}
+        )
+    )
+
+    result = runner.invoke(main, ["query", "--print", "--case-dir", str(tmp_path)])
+
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [
+        str(tmp_path / "1000"),
+        str(tmp_path / "2000"),
+    ]
+
+
+def test_searches_do_not_depend_on_earlier_queries(serve, tmp_path):
+    write_case(tmp_path, "1000", "Kernel panic")
+    write_case(tmp_path, "2000", "Kernel oops")
+    case_daemon = serve(str(tmp_path))
+    repo = daemon.open_repo(str(tmp_path))
+
+    repo.search("kernel")
+    matches = repo.search("kernel panic")
+
+    assert [case.sf for case in matches] == ["1000"]
+    assert case_daemon.search._last_query is None
+
+
+def test_daemon_applies_changes(serve, tmp_path):
+    write_case(tmp_path, "1000", "Kernel panic")
+    write_case(tmp_path, "2000", "Network outage")
+    case_daemon = serve(str(tmp_path))
+    repo = CaseRepo(str(tmp_path))
+    write_case(tmp_path, "3000", "Kernel oops")
+    (tmp_path / "1000" / "case.json").unlink()
+
+    known = {case.path.name: case.mtime_ns for case in case_daemon.cases}
+    case_daemon.apply_changes(repo._check(known, {"1000", "3000"}))
+
+    assert [case.sf for case in case_daemon.cases] == ["2000", "3000"]
+    matches = daemon.open_repo(str(tmp_path)).search("kernel")
+    assert [case.sf for case in matches] == ["3000"]
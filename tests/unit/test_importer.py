@@ -5,8 +5,8 @@ from pathlib import Path
 
 import pytest
 
-from kase.cases import Case
 from kase.importer import SalesforceCSV
+from kase.model import Case
 
 
 def write_salesforce_csv(path: Path, rows: list[dict[str, str]]) -> None:
@@ -121,3 +121,106 @@ def test_missing_value_in_row_raises(fs):
         match=r"Row 2 is missing value\(s\) for: Subject",
     ):
         list(importer.cases())
+
+
+def test_unused_columns_are_skipped(fs):
+    csv_path = Path("/cases.csv")
+    case_dir = Path("/cases")
+    fs.create_dir(case_dir)
+
+    fs.create_file(
+        csv_path,
+        contents=(
+            "\ufeffOwner,Description,Case Number,Status,Subject\r\n"
+            'Ann,"Spans\r\ntwo lines",0005,Open,Multiline\r\n'
+            "\r\n"
+            "Bob,Short,0006,Closed,Single\r\n"
+        ),
+        encoding="utf-8",
+    )
+
+    importer = SalesforceCSV(csv_path, case_dir)
+    cases = list(importer.cases())
+
+    assert [(case.sf, case.title) for case in cases] == [
+        ("0005", "Multiline"),
+        ("0006", "Single"),
+    ]
+    assert cases[0].desc == "Spans\r\ntwo lines"
+    assert cases[1].desc == "Short"
+
+
+def test_imported_cases_round_trip(fs):
+    csv_path = Path("/cases.csv")
+    case_dir = Path("/cases")
+    fs.create_dir(case_dir)
+
+    fs.create_file(
+        csv_path,
+        contents=(
+            "Case Number,Subject,Description\n"
+            '0007,Crash,"Kernel panic\non boot"\n'
+            "0008,Hang,Élan hangs\n"
+        ),
+        encoding="utf-8",
+    )
+
+    importer = SalesforceCSV(csv_path, case_dir)
+    cases = list(importer.cases())
+
+    assert "kernel panic" in cases[0].search_keys.text
+    assert Case.model_validate(cases[0].model_dump()) == cases[0]
+    assert cases[1].write_metadata()
+    assert Case.from_folder(case_dir / "0008").desc == "Élan hangs"
+
+
+def test_summaries_keep_only_the_start_of_long_descriptions(fs, monkeypatch):
+    csv_path = Path("/cases.csv")
+    case_dir = Path("/cases")
+    fs.create_dir(case_dir)
+    monkeypatch.setattr(SalesforceCSV, "SEARCH_PREFIX", 10)
+
+    fs.create_file(
+        csv_path,
+        contents=(
+            "\ufeffCase Number,Subject,Description\r\n"
+            '0009,Crash,"Kernel panic\r\non boot"\r\n'
+            "0010,Hang,Short\r\n"
+        ),
+        encoding="utf-8",
+    )
+
+    importer = SalesforceCSV(csv_path, case_dir)
+    cases = list(importer.summaries())
+
+    assert [case.sf for case in cases] == ["0009", "0010"]
+    assert cases[0]._desc is None
+    assert "kernel pan" in cases[0].search_keys.text
+    assert "boot" not in cases[0].search_keys.text
+    assert cases[0].desc == "Kernel panic\r\non boot"
+    assert cases[1].desc == "Short"
+    loaded = cases[0].load()
+    assert isinstance(loaded, Case)
+    assert loaded.write_metadata()
+    assert Case.from_folder(case_dir / "0009").desc == "Kernel panic\r\non boot"
+
+
+def test_summary_of_changed_export_fails_to_load(fs, monkeypatch):
+    csv_path = Path("/cases.csv")
+    case_dir = Path("/cases")
+    fs.create_dir(case_dir)
+    monkeypatch.setattr(SalesforceCSV, "SEARCH_PREFIX", 5)
+    write_salesforce_csv(
+        csv_path,
+        [{"Case Number": "0011", "Subject": "Crash", "Description": "Kernel panic"}],
+    )
+    case = next(SalesforceCSV(csv_path, case_dir).summaries())
+
+    write_salesforce_csv(
+        csv_path,
+        [{"Case Number": "0012", "Subject": "Other", "Description": "Replaced row"}],
+    )
+
+    with pytest.raises(ValueError, match="changed since it was read"):
+        case.load()
+    assert not (case_dir / "0011").exists()
@@ -0,0 +1,73 @@
+"""Unit tests for the persistent case index."""
+
+import json
+import os
+from pathlib import Path
+
+from kase.index import CaseIndex
+
+
+def test_load_missing_index_is_empty(fs):
+    index = CaseIndex(Path("/cases/.kase-index.json"))
+    index.load()
+
+    assert index.entries == {}
+
+
+def test_save_and_load_round_trip(fs):
+    fs.create_dir("/cases")
+    path = Path("/cases/.kase-index.json")
+    index = CaseIndex(path)
+    index.entries = {
+        "1234": {
+            "mtime_ns": 1,
+            "size": 2,
+            "data": {"title": "Test", "sf": "1234"},
+        }
+    }
+
+    assert index.save() is True
+
+    reloaded = CaseIndex(path)
+    reloaded.load()
+    assert reloaded.entries == index.entries
+    assert list(Path("/cases").iterdir()) == [path]
+
+
+def test_load_discards_other_versions(fs):
+    path = Path("/cases/.kase-index.json")
+    fs.create_file(path, contents=json.dumps({"version": -1, "cases": {"1": {}}}))
+
+    index = CaseIndex(path)
+    index.load()
+
+    assert index.entries == {}
+
+
+def test_load_discards_corrupt_index(fs):
+    path = Path("/cases/.kase-index.json")
+    fs.create_file(path, contents="{not json")
+
+    index = CaseIndex(path)
+    index.load()
+
+    assert index.entries == {}
+
+
+def test_save_to_missing_directory_fails_quietly(fs):
+    index = CaseIndex(Path("/missing/.kase-index.json"))
+
+    assert index.save() is False
+
+
+def test_lookup_checks_mtime_and_size(fs):
+    fs.create_file("/cases/1234/case.json", contents="{}")
+    stat = os.stat("/cases/1234/case.json")
+    index = CaseIndex(Path("/cases/.kase-index.json"))
+    index.entries["1234"] = CaseIndex.make_entry(stat, {"sf": "1234"})
+
+    assert index.lookup("1234", stat) is not None
+    assert index.lookup("5678", stat) is None
+
+    index.entries["1234"]["size"] += 1
+    assert index.lookup("1234", stat) is None
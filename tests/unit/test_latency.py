@@ -0,0 +1,66 @@
+"""Unit tests for the keystroke latency tracker."""
+
+import json
+
+from kase.tui.latency import KeystrokeLatency
+
+
+def test_superseded_keystrokes_are_painted_with_the_latest():
+    latency = KeystrokeLatency()
+    latency.keystroke(1, "p")
+    latency.keystroke(2, "py")
+    latency.stamp(2, "score_start")
+    latency.stamp(1, "score_start")
+
+    latency.painted(2)
+
+    assert len(latency.latencies) == 2
+    assert latency.latencies[0] >= latency.latencies[1]
+
+
+def test_later_keystrokes_stay_pending():
+    latency = KeystrokeLatency()
+    latency.keystroke(1, "p")
+    latency.keystroke(2, "py")
+
+    latency.painted(1)
+
+    assert len(latency.latencies) == 1
+    latency.painted(2)
+    assert len(latency.latencies) == 2
+
+
+def test_unknown_generations_are_ignored():
+    latency = KeystrokeLatency()
+    latency.stamp(3, "update")
+    latency.painted(3)
+
+    assert not latency.latencies
+    assert latency.percentiles() == {}
+
+
+def test_trace_appends_json_lines(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    trace.write_text('{"earlier": true}\n')
+    latency = KeystrokeLatency(trace)
+    latency.keystroke(1, "p")
+    latency.stamp(1, "update")
+    latency.painted(1)
+    latency.close()
+
+    lines = trace.read_text().splitlines()
+    assert len(lines) == 2
+    sample = json.loads(lines[1])
+    assert sample["generation"] == 1
+    assert sample["query"] == "p"
+    assert sample["input"] <= sample["update"] <= sample["paint"]
+
+
+def test_window_bounds_the_samples():
+    latency = KeystrokeLatency()
+    for generation in range(KeystrokeLatency.WINDOW + 10):
+        latency.keystroke(generation, "q")
+        latency.painted(generation)
+
+    assert len(latency.latencies) == KeystrokeLatency.WINDOW
+    assert set(latency.percentiles()) == {"p50", "p95", "p99", "max"}
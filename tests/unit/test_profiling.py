@@ -0,0 +1,101 @@
+"""Unit tests for profiling kase commands."""
+
+from typer.testing import CliRunner
+
+from kase import profiling
+from kase.cases import CaseRepo
+from kase.cli import main
+from kase.tui.query import QueryApp
+
+runner = CliRunner()
+
+
+def test_phases_are_ignored_without_a_profile():
+    with profiling.phase("parse"):
+        pass
+    profiling.mark("first paint")
+
+    assert profiling._active is None
+
+
+def test_profile_records_phases_and_writes_report(tmp_path, case_repo_query_small):
+    report = tmp_path / "profile.txt"
+
+    with profiling.profile(report) as profile:
+        list(CaseRepo(case_repo_query_small, use_index=False).cases)
+
+    assert profiling._active is None
+    assert len(profile.phases["parse"]) == 3
+    assert len(profile.phases["validate"]) == 3
+    assert len(profile.phases["discovery"]) == 1
+    text = report.read_text()
+    assert "Phases:" in text
+    assert "cProfile, by cumulative time:" in text
+
+
+def test_report_lists_each_filter_pass(tmp_path):
+    report = tmp_path / "profile.txt"
+
+    with profiling.profile(report) as profile:
+        profile.record("filter", 0.002, "py")
+        profile.record("filter", 0.001, "pyt")
+
+    lines = report.read_text().splitlines()
+    assert lines[lines.index("Filter:") + 1].endswith("ms  py")
+    assert lines[lines.index("Filter:") + 2].endswith("ms  pyt")
+
+
+async def test_first_paint_is_marked(tmp_path, case_repo_query_small):
+    with profiling.profile(tmp_path / "profile.txt") as profile:
+        app = QueryApp(case_repo_query_small)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+
+    assert len(profile.phases["first paint"]) == 1
+
+
+def test_profile_option_writes_report(tmp_path, case_repo_query_small):
+    report = tmp_path / "profile.txt"
+
+    result = runner.invoke(
+        main,
+        [
+            "--profile",
+            str(report),
+            "query",
+            "--print",
+            "--case-dir",
+            case_repo_query_small,
+            "python",
+        ],
+    )
+
+    assert result.exit_code == 0
+    text = report.read_text()
+    assert "discovery" in text
+    assert "python" in text.split("Filter:")[1]
+
+
+def test_profile_from_environment(tmp_path, case_repo_query_small):
+    report = tmp_path / "profile.txt"
+
+    result = runner.invoke(
+        main,
+        ["punch", "--print", "--case-dir", case_repo_query_small],
+        env={"KASE_PROFILE": str(report)},
+    )
+
+    assert result.exit_code == 0
+    assert "Phases:" in report.read_text()
+
+
+def test_percentiles():
+    samples = [float(n) for n in range(1, 101)]
+
+    assert profiling.percentiles(samples) == {
+        "p50": 50.0,
+        "p95": 95.0,
+        "p99": 99.0,
+        "max": 100.0,
+    }
+    assert profiling.percentiles([]) == {}
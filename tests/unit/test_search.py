@@ -0,0 +1,379 @@
+"""Unit tests for the search module."""
+
+import threading
+from pathlib import Path
+
+import pytest
+from rapidfuzz.fuzz import partial_ratio
+from rapidfuzz.utils import default_process
+
+from kase import bench
+from kase.model import Case
+from kase.search import (
+    SCORE_CUTOFF,
+    CaseSearch,
+    NumberIndex,
+    SearchKeys,
+    fuzzy_scores,
+    process_query,
+    rank,
+)
+
+
+def test_search_keys_normalize_fields():
+    keys = SearchKeys.build("1234", "LP#5678", "Kernel Panic!", "Some Description")
+
+    assert keys.sf == "1234"
+    assert keys.lp == "lp 5678"
+    assert keys.title == "kernel panic"
+
+
+def test_search_keys_text_matches_legacy_concatenation():
+    fields = ["1234", "", "Kernel Panic", "Boot fails: oops"]
+
+    keys = SearchKeys.build(*fields)
+
+    assert keys.text == default_process(" ".join(fields))
+
+
+def test_process_query_matches_default_process():
+    assert process_query("Kernel PAN") == "kernel pan"
+
+
+def make_case(sf: str, title: str, desc: str = "") -> Case:
+    return Case(path=Path(f"/cases/{sf}"), title=title, desc=desc, sf=sf)
+
+
+def legacy_matches(cases: list[Case], query: str) -> list[Case]:
+    """The per-case scoring loop that fuzzy_scores replaced."""
+    return [
+        case
+        for case in cases
+        if partial_ratio(
+            " ".join([case.sf, case.lp, case.title, case.desc]),
+            query,
+            processor=default_process,
+        )
+        / 100.0
+        > 0.8
+    ]
+
+
+CASES = [
+    make_case("1234", "Kernel panic on boot", "Machine fails to start"),
+    make_case("5678", "Network timeout", "Pings drop after an hour"),
+    make_case("9999", "Python Related Case", "Testing Python functionality"),
+    make_case("4321", "Kernel upgrade", "Needs a reboot"),
+]
+
+
+@pytest.fixture(params=[True, False], ids=["cdist", "extract"])
+def scoring_backend(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr("kase.search._have_numpy", lambda: request.param)
+
+
+@pytest.mark.usefixtures("scoring_backend")
+class TestFuzzyScores:
+    def test_scores_above_cutoff_in_choice_order(self):
+        scores = fuzzy_scores("kernel", ["network", "kernel panic", "old kernel"])
+
+        assert [position for position, _ in scores] == [1, 2]
+        assert all(score > SCORE_CUTOFF for _, score in scores)
+
+    def test_empty_query_or_choices(self):
+        assert fuzzy_scores("", ["kernel"]) == []
+        assert fuzzy_scores("kernel", []) == []
+
+    @pytest.mark.parametrize(
+        "query", ["Kernel", "kernal panic", "python", "1234", "pings drop", "zz"]
+    )
+    def test_case_search_matches_legacy_scoring(self, query):
+        assert CaseSearch(CASES).filter(query) == legacy_matches(CASES, query)
+
+    def test_case_search_filter(self):
+        search = CaseSearch(CASES)
+
+        assert [case.sf for case in search.filter("kernel")] == ["1234", "4321"]
+
+    def test_case_search_add_replaces_same_sf(self):
+        search = CaseSearch(CASES)
+
+        search.add([make_case("1234", "Storage issue")])
+
+        assert len(search) == len(CASES)
+        assert [case.sf for case in search.filter("kernel")] == ["4321"]
+        assert [case.sf for case in search.filter("storage")] == ["1234"]
+
+    def test_case_search_limit_ranks_by_score(self):
+        search = CaseSearch(
+            [
+                make_case("1000", "Kernel crash dump analysis"),
+                make_case("1001", "kernal"),
+                make_case("1002", "Kernel"),
+            ]
+        )
+
+        ranked = search.filter("kernel", limit=2)
+
+        assert [case.sf for case in ranked] == ["1002", "1000"]
+
+    def test_case_search_limit_breaks_ties_by_newest_sf(self):
+        search = CaseSearch(
+            [
+                make_case("1000", "Kernel"),
+                make_case("3000", "Kernel"),
+                make_case("2000", "Kernel"),
+            ]
+        )
+
+        assert [case.sf for case in search.filter("kernel", limit=3)] == [
+            "3000",
+            "2000",
+            "1000",
+        ]
+        assert [case.sf for case in search.filter("kernel", limit=1)] == ["3000"]
+
+
+def test_rank_handles_non_numeric_sf():
+    cases = [make_case("abc", "Kernel"), make_case("10", "Kernel")]
+
+    assert rank(cases, [(0, 100.0), (1, 100.0)], limit=2) == [1, 0]
+
+
+class TestIncrementalRefinement:
+    def test_extended_query_rescores_only_survivors(self, mocker):
+        search = CaseSearch(CASES)
+        spy = mocker.patch("kase.search.fuzzy_scores", wraps=fuzzy_scores)
+
+        search.filter("kern")
+        refined = search.filter("kernel p")
+
+        assert len(spy.call_args_list[0].args[1]) == len(CASES)
+        assert len(spy.call_args_list[1].args[1]) == 2
+        assert [case.sf for case in refined] == legacy_sfs(CASES, "kernel p")
+
+    def test_deletion_falls_back_to_full_scan(self, mocker):
+        search = CaseSearch(CASES)
+        search.filter("kernel pa")
+        spy = mocker.patch("kase.search.fuzzy_scores", wraps=fuzzy_scores)
+
+        widened = search.filter("kernel")
+
+        assert len(spy.call_args.args[1]) == len(CASES)
+        assert [case.sf for case in widened] == ["1234", "4321"]
+
+    def test_edit_in_middle_falls_back_to_full_scan(self, mocker):
+        search = CaseSearch(CASES)
+        search.filter("netw")
+        spy = mocker.patch("kase.search.fuzzy_scores", wraps=fuzzy_scores)
+
+        result = search.filter("kerw")
+
+        assert len(spy.call_args.args[1]) == len(CASES)
+        assert [case.sf for case in result] == legacy_sfs(CASES, "kerw")
+
+    def test_cases_added_after_query_are_scored(self):
+        search = CaseSearch(CASES)
+        search.filter("kern")
+
+        search.add([make_case("7777", "Kernel oops")])
+
+        assert [case.sf for case in search.filter("kernel")] == [
+            "1234",
+            "4321",
+            "7777",
+        ]
+
+    def test_replaced_case_invalidates_survivors(self):
+        search = CaseSearch(CASES)
+        search.filter("kern")
+
+        search.add([make_case("5678", "Kernel network timeout")])
+
+        assert [case.sf for case in search.filter("kernel")] == [
+            "1234",
+            "5678",
+            "4321",
+        ]
+
+
+def legacy_sfs(cases: list[Case], query: str) -> list[str]:
+    return [case.sf for case in legacy_matches(cases, query)]
+
+
+class TestCaseSearchTypos:
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "netwrok",
+            "memroy",
+            "kerenl",
+            "opnestack",
+            "clsuter upgarde",
+            "kernel pnaic",
+            "certifcate expierd",
+            "databse replicaton",
+            "regsitry imgae",
+        ],
+    )
+    def test_typos_match_as_in_legacy_scoring(self, query):
+        cases = [
+            make_case(sf, title, desc)
+            for sf, title, desc in bench._synthetic_cases(300, 200, 0, 1)
+        ]
+
+        assert [case.sf for case in CaseSearch(cases).filter(query)] == legacy_sfs(
+            cases, query
+        )
+
+    def test_replaced_case_is_rescored(self):
+        search = CaseSearch(CASES)
+        search.filter("storage")
+
+        search.add([make_case("5678", "Storage outage")])
+
+        assert [case.sf for case in search.filter("storage")] == ["5678"]
+
+
+class TestNumberIndex:
+    def test_prefix_lookup_on_sf_and_lp(self):
+        cases = [
+            make_case("03812345", "First"),
+            make_case("03819999", "Second"),
+            make_case("04000000", "Third"),
+            Case(path=Path("/cases/5"), title="Fourth", desc="", sf="5", lp="LP#0381"),
+        ]
+        index = NumberIndex(cases)
+
+        assert index.lookup("0381") == [0, 1, 3]
+        assert index.lookup("038123") == [0]
+        assert index.lookup("7") == []
+
+    def test_lookup_sees_appended_cases(self):
+        cases = [make_case("1000", "First")]
+        index = NumberIndex(cases)
+        assert index.lookup("10") == [0]
+
+        cases.append(make_case("1001", "Second"))
+
+        assert index.lookup("10") == [0, 1]
+
+
+class TestNumericQueries:
+    def test_numeric_query_uses_case_numbers(self, mocker):
+        search = CaseSearch(CASES)
+        spy = mocker.patch("kase.search.fuzzy_scores", wraps=fuzzy_scores)
+
+        assert [case.sf for case in search.filter("12")] == ["1234"]
+        spy.assert_not_called()
+
+    def test_numeric_query_without_hits_falls_back_to_fuzzy(self):
+        search = CaseSearch([make_case("1000", "Error code 40404")])
+
+        assert [case.sf for case in search.filter("4040")] == ["1000"]
+
+    def test_numeric_hits_are_ranked_by_recency(self):
+        search = CaseSearch([make_case("1000", "A"), make_case("1002", "B")])
+
+        assert [case.sf for case in search.filter("100", limit=1)] == ["1002"]
+
+
+class TestLazySearchText:
+    def test_search_text_is_collected_on_first_query(self):
+        cases = [make_case("1000", "Kernel panic"), make_case("1001", "Network")]
+        search = CaseSearch(cases)
+
+        assert all("search_keys" not in case.__dict__ for case in cases)
+        assert [case.sf for case in search.filter("kernel")] == ["1000"]
+        assert all("search_keys" in case.__dict__ for case in cases)
+
+    def test_numeric_hits_do_not_need_search_text(self):
+        cases = [make_case("1000", "Kernel panic")]
+        search = CaseSearch(cases)
+
+        assert [case.sf for case in search.filter("10")] == ["1000"]
+        assert "search_keys" not in cases[0].__dict__
+
+
+class TestCaseSearchRemove:
+    def test_removed_cases_no_longer_match(self):
+        cases = [
+            make_case("1000", "Kernel panic"),
+            make_case("1001", "Kernel oops"),
+            make_case("1002", "Network"),
+        ]
+        search = CaseSearch(cases)
+        assert len(search.filter("kernel")) == 2
+
+        search.remove({"1000"})
+
+        assert len(search) == 2
+        assert [case.sf for case in search.filter("kernel")] == ["1001"]
+        assert [case.sf for case in search.filter("100")] == ["1001", "1002"]
+
+    def test_remove_before_texts_are_loaded(self):
+        search = CaseSearch([make_case("1000", "Kernel panic")])
+        search.filter("kernel")
+        search.add([make_case("1001", "Kernel oops"), make_case("1002", "Kernel")])
+
+        search.remove({"1001"})
+        search.add([make_case("1003", "Kernel bug")])
+
+        assert [case.sf for case in search.filter("kernel")] == [
+            "1000",
+            "1002",
+            "1003",
+        ]
+
+    def test_search_after_remove(self):
+        cases = [
+            make_case(str(1000 + i), f"Case {i} kernel" if i % 2 else f"Case {i}")
+            for i in range(300)
+        ]
+        search = CaseSearch(cases)
+        removed = {case.sf for case in cases[:100]}
+        assert len(search.filter("kernel")) == len(cases) // 2
+
+        search.remove(removed)
+
+        expected = legacy_sfs(cases[100:], "kernel")
+        assert [case.sf for case in search.filter("kernel")] == expected
+
+
+class TestCaseSearchConcurrency:
+    def test_add_and_remove_do_not_wait_for_filter(self, mocker):
+        search = CaseSearch([make_case("1000", "Kernel panic")])
+        scoring = threading.Event()
+        release = threading.Event()
+
+        def slow_scores(query, choices):
+            scoring.set()
+            release.wait(timeout=5)
+            return fuzzy_scores(query, choices)
+
+        mocker.patch("kase.search.fuzzy_scores", side_effect=slow_scores)
+        results = []
+        filtering = threading.Thread(
+            target=lambda: results.append(search.filter("kernel"))
+        )
+        filtering.start()
+        assert scoring.wait(timeout=5)
+
+        changes = threading.Thread(
+            target=lambda: (
+                search.add([make_case("1001", "Kernel oops")]),
+                search.remove({"1000"}),
+            )
+        )
+        changes.start()
+        changes.join(timeout=1)
+        finished = not changes.is_alive()
+        release.set()
+        filtering.join(timeout=5)
+
+        assert finished
+        # The pass that was running scored the cases as they were
+        assert [case.sf for case in results[0]] == ["1000"]
+        assert [case.sf for case in search.filter("kernel")] == ["1001"]
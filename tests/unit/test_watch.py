@@ -0,0 +1,203 @@
+"""Unit tests for watching a case directory for changes."""
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from kase import watch
+from kase.cases import CaseRepo, ChangeKind
+
+
+def write_case(case_dir: Path, sf: str, title: str) -> None:
+    folder = case_dir / sf
+    folder.mkdir(exist_ok=True)
+    (folder / "case.json").write_text(
+        json.dumps({"title": title, "desc": "", "sf": sf, "lp": ""})
+    )
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def watcher_kind(request, monkeypatch):
+    """Run a test against both ways of noticing changes."""
+    if request.param == "inotify":
+        if not sys.platform.startswith("linux"):
+            pytest.skip("inotify is Linux only")
+    else:
+        monkeypatch.setattr(watch, "Inotify", _unavailable)
+    return request.param
+
+
+def _unavailable(case_dir: str, interval: float):
+    raise OSError("inotify disabled for this test")
+
+
+class Watching:
+    """Runs CaseRepo.watch on a thread, collecting the changes it yields."""
+
+    def __init__(self, repo: CaseRepo):
+        self.repo = repo
+        self.stop = threading.Event()
+        self.changes: queue.Queue = queue.Queue()
+        cases = list(repo.cases)
+        self.thread = threading.Thread(target=self._run, args=(cases,), daemon=True)
+        self.thread.start()
+
+    def _run(self, cases) -> None:
+        for changes in self.repo.watch(cases, self.stop, interval=0.05):
+            for change in changes:
+                self.changes.put(change)
+
+    def next(self, timeout: float = 5.0):
+        return self.changes.get(timeout=timeout)
+
+    def close(self) -> None:
+        self.stop.set()
+        self.thread.join(timeout=5.0)
+
+
+@pytest.fixture
+def watching(tmp_path, watcher_kind):
+    write_case(tmp_path, "1000", "Kernel panic")
+    started = []
+
+    def _watch() -> Watching:
+        started.append(Watching(CaseRepo(str(tmp_path))))
+        return started[-1]
+
+    yield _watch
+    for watcher in started:
+        watcher.close()
+
+
+def test_open_watcher_falls_back_to_polling(tmp_path):
+    watcher = watch.open_watcher(str(tmp_path / "missing"), 1.0)
+
+    assert isinstance(watcher, watch.Poller)
+
+
+def test_open_watcher_polls_network_filesystems(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch, "_fs_type", lambda path: 0x6969)
+
+    assert isinstance(watch.open_watcher(str(tmp_path), 1.0), watch.Poller)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="statfs")
+def test_local_filesystem_is_not_network(tmp_path):
+    assert not watch._is_network_fs(str(tmp_path))
+
+
+def test_added_case(tmp_path, watching):
+    watcher = watching()
+    write_case(tmp_path, "2000", "Network outage")
+
+    change = watcher.next()
+
+    assert change.kind is ChangeKind.added
+    assert change.path == tmp_path / "2000"
+    assert change.case.title == "Network outage"
+
+
+def test_changed_case(tmp_path, watching):
+    watcher = watching()
+    meta = tmp_path / "1000" / "case.json"
+    write_case(tmp_path, "1000", "Kernel panic, again")
+    # Make sure the mtime differs on filesystems with coarse timestamps
+    stat = meta.stat()
+    os.utime(meta, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    change = watcher.next()
+
+    assert change.kind is ChangeKind.changed
+    assert change.case.title == "Kernel panic, again"
+
+
+def test_removed_case(tmp_path, watching):
+    watcher = watching()
+    (tmp_path / "1000" / "case.json").unlink()
+
+    change = watcher.next()
+
+    assert change.kind is ChangeKind.removed
+    assert change.path == tmp_path / "1000"
+    assert change.case is None
+
+
+def test_half_written_case_is_reported_once_valid(tmp_path, watching):
+    watcher = watching()
+    folder = tmp_path / "2000"
+    folder.mkdir()
+    (folder / "case.json").write_text('{"title": ')
+    write_case(tmp_path, "2000", "Finished")
+
+    change = watcher.next()
+
+    assert change.kind is ChangeKind.added
+    assert change.case.title == "Finished"
+
+
+def test_catches_up_with_changes_since_listing(tmp_path):
+    write_case(tmp_path, "1000", "Kernel panic")
+    repo = CaseRepo(str(tmp_path))
+    cases = list(repo.cases)
+    write_case(tmp_path, "2000", "Listed too late")
+    stop = threading.Event()
+    stop.set()
+
+    batches = list(repo.watch(cases, stop))
+
+    assert [[change.kind for change in batch] for batch in batches] == [
+        [ChangeKind.added]
+    ]
+
+
+def test_polling_leaves_catching_up_to_the_first_poll(tmp_path, monkeypatch, mocker):
+    monkeypatch.setattr(watch, "Inotify", _unavailable)
+    write_case(tmp_path, "1000", "Kernel panic")
+    repo = CaseRepo(str(tmp_path))
+    cases = list(repo.cases)
+    check = mocker.spy(repo, "_check")
+    stop = threading.Event()
+    stop.set()
+
+    assert list(repo.watch(cases, stop)) == []
+    check.assert_not_called()
+
+
+def test_poller_waits_longer_after_slow_checks():
+    poller = watch.Poller("/cases", 0.01)
+    changes = poller.changes(threading.Event())
+
+    assert next(changes) is None
+    # A check of the case folders that took 20 ms
+    time.sleep(0.02)
+    resumed = time.monotonic()
+    assert next(changes) is None
+
+    assert time.monotonic() - resumed >= watch.POLL_COST_FACTOR * 0.02
+    changes.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify")
+def test_inotify_reports_touched_folders(tmp_path):
+    write_case(tmp_path, "1000", "Kernel panic")
+    inotify = watch.Inotify(str(tmp_path), 1.0)
+    stop = threading.Event()
+    changes = inotify.changes(stop)
+
+    write_case(tmp_path, "2000", "Network outage")
+    assert next(changes) == {"2000"}
+
+    # Both the existing folder and the one added since are watched
+    write_case(tmp_path, "1000", "Kernel panic, again")
+    write_case(tmp_path, "2000", "Network outage, again")
+    (tmp_path / ".kase-index.json").write_text("{}")
+    assert next(changes) == {"1000", "2000"}
+
+    stop.set()
+    changes.close()